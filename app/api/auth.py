@@ -2,12 +2,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.user import User
 from app.schemas.user import AccessToken, LoginRequest, UserCreate, UserResponse
-from app.services.user import get_user_by_email, create_user
-from app.core.deps import get_db
-from app.core.dependencies import get_current_user
+from app.services.user import get_user, get_user_by_email, create_user
+from app.core.deps import get_db, get_read_db
+from app.core.dependencies import Principal, get_current_user
 from app.core.security import create_access_token
+from app.services.password import verify_password
 
 
 
@@ -15,13 +15,17 @@ router = APIRouter()
 
 @router.post("/login", response_model=AccessToken)
 async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
-    db_user = await get_user_by_email(db, login_data.email)    
+    db_user = await get_user_by_email(db, login_data.email, with_password=True)    
     if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     if not db_user.active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is inactive")    
-    if not login_data.password == db_user.password:
+    valid, new_hash = await verify_password(login_data.password, db_user.password)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # Hash legado o de un esquema obsoleto: get_db guarda el nuevo al terminar
+        db_user.password = new_hash
     access_token = create_access_token(data={"sub": db_user.email, "role": str(db_user.role)})    
     return AccessToken(access_token=access_token, token_type="Bearer")
     
@@ -61,18 +65,19 @@ async def register(
     
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_data(    
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     try:
+        user = await get_user(db, current_user.id)
         return UserResponse(
-            id=current_user.id,
-            name_complete=current_user.name_complete,
-            email=current_user.email,
-            role=str(current_user.role.value),
-            active=current_user.active,
-            created_at=current_user.created_at,
-            updated_at=current_user.updated_at,
+            id=user.id,
+            name_complete=user.name_complete,
+            email=user.email,
+            role=str(user.role.value),
+            active=user.active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
         )
     except Exception as e:
         print(f"Error fetching current user: {e}")
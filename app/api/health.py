@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from app.core.deps import get_pool_stats, ping_database
+from app.core.jobs import job_queue
+from app.utils.cache import get_cache_stats
+from app.utils.metrics import gauge, registry
+
+router = APIRouter()
+
+DB_POOL = gauge("db_pool_connections", "Conexiones del pool por estado", ("state",))
+DB_POOL_WAIT = gauge("db_pool_checkout_wait_seconds", "Espera acumulada y maxima para obtener una conexion", ("stat",))
+DB_POOL_CONNECT = gauge("db_pool_connect_seconds", "Tiempo acumulado y maximo abriendo conexiones nuevas", ("stat",))
+CACHE_ENTRIES = gauge("cache_entries", "Entradas en cada cache en memoria", ("cache",))
+CACHE_LOOKUPS = gauge("cache_lookups", "Consultas a cada cache en memoria por resultado", ("cache", "result"))
+
+
+@registry.register_collector
+def collect_pool_stats() -> None:
+    stats = get_pool_stats()
+    if not stats["initialized"]:
+        return
+    for state in ("checked_in", "checked_out", "overflow"):
+        DB_POOL.set(state, value=stats[state])
+    DB_POOL_WAIT.set("total", value=stats["wait_time_total"])
+    DB_POOL_WAIT.set("max", value=stats["wait_time_max"])
+    DB_POOL_CONNECT.set("total", value=stats["connect_time_total"])
+    DB_POOL_CONNECT.set("max", value=stats["connect_time_max"])
+
+
+@registry.register_collector
+def collect_cache_stats() -> None:
+    for name, stats in get_cache_stats().items():
+        CACHE_ENTRIES.set(name, value=stats["size"])
+        CACHE_LOOKUPS.set(name, "hit", value=stats["hits"])
+        CACHE_LOOKUPS.set(name, "miss", value=stats["misses"])
+
+
+READY_TIMEOUT_SECONDS = 2
+
+
+@router.get("/health/live")
+async def live():
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def ready(request: Request):
+    # Listo cuando termino el warm-up del lifespan y la base de datos responde
+    if not getattr(request.app.state, "ready", False):
+        return ORJSONResponse({"status": "starting"}, status_code=503)
+    try:
+        await ping_database(READY_TIMEOUT_SECONDS)
+    except Exception as e:
+        print(f"Readiness check failed: {e}")
+        return ORJSONResponse({"status": "unavailable"}, status_code=503)
+    return {"status": "ready"}
+
+
+@router.get("/health/pool")
+async def pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/health/caches")
+async def cache_stats():
+    return get_cache_stats()
+
+
+@router.get("/health/jobs")
+async def job_stats():
+    return job_queue.stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,42 +1,69 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import JSONResponse
-from app.models.user import User, UserRole
-from app.schemas.post import PostCreate, PostResponse, PostUpdate
-from app.schemas.tag import TagResponse
-from app.services.post import create_post, get_post, get_posts, update_post, delete_post, filter_posts
-from app.core.deps import get_db
-from app.core.dependencies import get_current_user
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from app.models.user import UserRole
+from app.schemas.post import PostBulkCreate, PostBulkCreateResponse, PostBulkDelete, PostBulkDeleteResponse, PostCreate, PostCursorPage, PostResponse, PostUpdate
+from app.services.post import create_post, create_posts_bulk, get_post, get_post_version, get_posts, get_posts_versions, update_post, delete_post, delete_posts, filter_posts, stream_posts, EXPORT_BATCH_SIZE
+from app.core.deps import get_db, get_read_db, get_read_sessionmaker, has_recent_write
+from app.core.dependencies import Principal, get_current_user
+from app.utils.export import encode_posts
+from app.utils.etag import CACHE_CONTROL, etag_matches, page_etag, post_etag
+from app.utils.pagination import MAX_OFFSET, decode_cursor, encode_cursor
+from app.utils.serializers import resolve_post_fields, serialize_post
 
 router = APIRouter()
 
-@router.get("/all", response_model=List[PostResponse])
+@router.get("/all", response_model=Union[List[PostResponse], PostCursorPage])
 async def read_posts(    
+    request: Request,
     limit: int = Query(default=100, ge=1, le=500),
-    offset: int = Query(default=0, ge=0),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    offset: int = Query(default=0, ge=0, le=MAX_OFFSET),
+    paginate: str = Query(default="offset", regex="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(default=None),
+    view: str = Query(default="full", regex="^(full|summary)$"),
+    fields: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):    
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        selected_fields = resolve_post_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cursor_mode = paginate == "cursor" or bool(cursor)
+    # La proyeccion forma parte de la representacion: ETags distintos por cada una
+    etag_extra = (cursor_mode,) if selected_fields is None else (cursor_mode, ",".join(selected_fields))
     try:
         if current_user.role in [UserRole.admin, UserRole.editor, UserRole.lector]:
-            posts = await get_posts(db, offset=offset, limit=limit)            
-            posts_response = [
-                PostResponse(
-                    id=post.id,
-                    title=post.title,  
-                    content=post.content,  
-                    tags=[TagResponse(id=tag.id, name=tag.name) for tag in post.tags],  
-                    created_at=post.created_at,
-                    updated_at=post.updated_at,
-                    user_id=post.user_id,
-                    deleted=post.deleted 
-                )
-                for post in posts
-            ]            
-            return posts_response
+            if_none_match = request.headers.get("if-none-match")
+            if if_none_match:
+                versions = await get_posts_versions(db, offset=offset, limit=limit, after=after)
+                etag = page_etag(versions, *etag_extra)
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+            posts = await get_posts(db, offset=offset, limit=limit, after=after, fields=selected_fields)
+            content = [serialize_post(post, selected_fields) for post in posts]
+            if cursor_mode:
+                next_cursor = None
+                if len(posts) == limit:
+                    next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id)
+                content = {"posts": content, "next_cursor": next_cursor}
+            return ORJSONResponse(
+                content,
+                headers={"ETag": page_etag(posts, *etag_extra), "Cache-Control": CACHE_CONTROL}
+            )
         else:
             raise HTTPException(status_code=403, detail="Permission denied")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error listing posts: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -44,41 +71,63 @@ async def read_posts(
 @router.post("/create", response_model=PostResponse)
 async def build_post(
     post: PostCreate, 
+    defer_tags: bool = Query(default=False),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         if current_user.role in [UserRole.admin, UserRole.editor]:
             post.user_id = current_user.id
-            return await create_post(db, post)        
+            return await create_post(db, post, defer_tags=defer_tags)        
         raise HTTPException(status_code=403, detail="Permission denied")
     except Exception as e:
         print(f"Error creating post for others, only can ADMIN and EDITOR : {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
     
         
+@router.post("/bulk/create", response_model=PostBulkCreateResponse)
+async def build_posts_bulk(
+    payload: PostBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role not in [UserRole.admin, UserRole.editor]:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    try:
+        return await create_posts_bulk(db, payload.posts, user_id=current_user.id)
+    except Exception as e:
+        print(f"Error creating posts in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 @router.get("/show/{post_id}", response_model=PostResponse)
 async def read_post(
     post_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         if current_user.role in [UserRole.admin, UserRole.editor, UserRole.lector]:
+            if_none_match = request.headers.get("if-none-match")
+            if if_none_match:
+                version = await get_post_version(db, post_id=post_id)
+                if version is None:
+                    raise HTTPException(status_code=404, detail="Post not found or deleted")
+                etag = post_etag(version.id, version.updated_at)
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
             post = await get_post(db, post_id=post_id)
             if post:
-                return PostResponse(
-                    id=post.id,
-                    title=post.title,  
-                    content=post.content,  
-                    tags=[TagResponse(id=tag.id, name=tag.name) for tag in post.tags],  
-                    created_at=post.created_at,
-                    updated_at=post.updated_at,
-                    user_id=post.user_id,
-                    deleted=post.deleted 
+                return ORJSONResponse(
+                    serialize_post(post),
+                    headers={"ETag": post_etag(post.id, post.updated_at), "Cache-Control": CACHE_CONTROL}
                 )
             raise HTTPException(status_code=404, detail="Post not found or deleted")
         raise HTTPException(status_code=403, detail="Permission denied")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error reading post: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -87,29 +136,22 @@ async def read_post(
 async def edit_post(
     post_id: str,
     post_data: PostUpdate,
+    defer_tags: bool = Query(default=False),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):    
     try:
         if current_user.role in [UserRole.admin, UserRole.editor]:            
-            post = await get_post(db, post_id=post_id)            
-            if post.user_id == current_user.id:            
-                updated_post = await update_post(
-                    db, 
-                    post_id=post.id, 
-                    post_data=post_data
-                )
-                if updated_post:  
-                    return PostResponse(
-                        id=updated_post.id,
-                        title=updated_post.title,  
-                        content=updated_post.content,  
-                        tags=[TagResponse(id=tag.id, name=tag.name) for tag in updated_post.tags],  
-                        created_at=updated_post.created_at,
-                        updated_at=updated_post.updated_at,
-                        user_id=updated_post.user_id,
-                        deleted=updated_post.deleted 
-                    )        
+            # Solo el autor puede editar: el filtro por user_id va en el propio UPDATE
+            updated_post = await update_post(
+                db, 
+                post_id=post_id, 
+                post_data=post_data,
+                user_id=current_user.id,
+                defer_tags=defer_tags
+            )
+            if updated_post:  
+                return updated_post
         raise HTTPException(status_code=403, detail="Permission denied")
     except Exception as e:
         print(f"Error editing post for others, only can ADMIN and EDITOR : {e}")
@@ -120,7 +162,7 @@ async def edit_post(
 async def erase_post(
     post_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         if current_user.role in [UserRole.admin, UserRole.editor]:
@@ -132,20 +174,70 @@ async def erase_post(
         print(f"Error deleting post for others, only can ADMIN and EDITOR : {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+@router.post("/bulk/delete", response_model=PostBulkDeleteResponse)
+async def erase_posts_bulk(
+    payload: PostBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role not in [UserRole.admin, UserRole.editor]:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    try:
+        post_ids = list(dict.fromkeys(payload.ids))
+        deleted = await delete_posts(db, post_ids)
+        deleted_ids = set(deleted)
+        return {
+            "deleted": deleted,
+            "not_found": [post_id for post_id in post_ids if post_id not in deleted_ids],
+        }
+    except Exception as e:
+        print(f"Error deleting posts in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.get("/export")
+async def export_posts(
+    request: Request,
+    format: str = Query(default="ndjson", regex="^(ndjson|csv)$"),
+    since: Optional[datetime] = Query(default=None),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role not in [UserRole.admin, UserRole.editor, UserRole.lector]:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    async def content():
+        # Sesion propia: vive mientras dura el streaming, no lo que dura el endpoint
+        async with get_read_sessionmaker(primary=has_recent_write(request))() as session:
+            posts = stream_posts(session, since=since, batch_size=EXPORT_BATCH_SIZE)
+            async for chunk in encode_posts(posts, format, EXPORT_BATCH_SIZE):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="posts.{format}"'}
+    )
+
 @router.get("/filter")
 async def search_posts(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-    search: Optional[str] = Query(default=None)
+    search: Optional[str] = Query(default=None),
+    view: str = Query(default="full", regex="^(full|summary)$"),
+    fields: Optional[str] = Query(default=None)
 ):    
     if current_user.role in [UserRole.admin, UserRole.editor, UserRole.lector]:
+        try:
+            selected_fields = resolve_post_fields(view, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         posts = await filter_posts(
             db, 
             limit=limit, 
             offset=offset, 
-            search=search
+            search=search,
+            fields=selected_fields
         )
         return posts
         
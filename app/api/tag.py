@@ -0,0 +1,31 @@
+# app/api/tag.py
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import UserRole
+from app.schemas.tag import TagCountResponse
+from app.services.post import get_tag_counts
+from app.core.deps import get_read_db
+from app.core.dependencies import Principal, get_current_user
+
+router = APIRouter()
+
+
+@router.get("/all", response_model=List[TagCountResponse])
+async def read_tags(
+    sort: str = Query(default="count", regex="^(count|name)$"),
+    limit: Optional[int] = Query(default=100, ge=1, le=1000),
+    cached: bool = Query(default=False),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        if current_user.role in [UserRole.admin, UserRole.editor, UserRole.lector]:
+            return await get_tag_counts(db, sort=sort, limit=limit, cached=cached)
+        else:
+            raise HTTPException(status_code=403, detail="Permission denied")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error listing tags: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
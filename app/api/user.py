@@ -1,40 +1,44 @@
 # app/api/users.py
-from typing import List, Optional
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import JSONResponse
-from app.models.user import User, UserRole
-from app.schemas.user import UserResponse, UserUpdate
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.models.user import UserRole
+from app.schemas.user import UserCursorPage, UserResponse, UserUpdate
 from app.services.user import get_user, get_users, update_user, deactivate_user, activate_user, filter_users
-from app.core.deps import get_db
-from app.core.dependencies import get_current_user
+from app.core.deps import get_db, get_read_db
+from app.core.dependencies import Principal, get_current_user
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.pagination import MAX_OFFSET, decode_cursor, encode_cursor
+from app.utils.serializers import serialize_user
 
 router = APIRouter()
 
 
-@router.get("/all", response_model=List[UserResponse])
+@router.get("/all", response_model=Union[List[UserResponse], UserCursorPage])
 async def read_users(    
     limit: int = Query(default=100, ge=1, le=500),
-    offset: int = Query(default=0, ge=0),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    offset: int = Query(default=0, ge=0, le=MAX_OFFSET),
+    paginate: str = Query(default="offset", regex="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):    
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
         if current_user.role == UserRole.admin:   
-            users = await get_users(db, offset=offset, limit=limit)
-            users_response = [
-                UserResponse(
-                    id=user.id,
-                    name_complete=user.name_complete,
-                    email=user.email,
-                    role=str(user.role.value),
-                    active=user.active,
-                    created_at=user.created_at,
-                    updated_at=user.updated_at,
-                )  
-                for user in users
-            ]
-            return users_response
+            users = await get_users(db, offset=offset, limit=limit, after=after)
+            content = users
+            if paginate == "cursor" or cursor:
+                next_cursor = None
+                if len(users) == limit:
+                    next_cursor = encode_cursor(users[-1]["created_at"], users[-1]["id"])
+                content = {"users": content, "next_cursor": next_cursor}
+            return ORJSONResponse(content)
         else:
             raise HTTPException(status_code=403, detail="Permission denied")
     except Exception as e:
@@ -46,24 +50,14 @@ async def read_users(
 @router.get("/show/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: str, 
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         if current_user.role == UserRole.admin:    
             user = await get_user(db, user_id)    
             if user:
-                # Crea y retorna la instancia de UserResponse directamente
-                user_response = UserResponse(
-                    id=user.id,
-                    name_complete=user.name_complete,
-                    email=user.email,
-                    role=str(user.role.value),
-                    active=user.active,
-                    created_at=user.created_at,
-                    updated_at=user.updated_at,
-                )
-                return user_response
+                return ORJSONResponse(serialize_user(user))
             else:
                 raise HTTPException(status_code=404, detail="User not found")
         else:
@@ -78,7 +72,7 @@ async def edit_user(
     user_id: str,
     user: UserUpdate, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:        
         if current_user.role == UserRole.admin: 
@@ -105,7 +99,7 @@ async def edit_user(
 async def delete_user(
     user_id: str, 
     db: AsyncSession = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         if current_user.role == UserRole.admin:        
@@ -123,7 +117,7 @@ async def delete_user(
 async def activat_user(
     user_id: str, 
     db: AsyncSession = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         if current_user.role == UserRole.admin:        
@@ -140,8 +134,8 @@ async def activat_user(
     
 @router.get("/filter")
 async def filter_list_users(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
     search: Optional[str] = Query(default=None)
@@ -152,6 +146,10 @@ async def filter_list_users(
             return {"users": users_filters}
         else:
             raise HTTPException(status_code=403, detail="Permission denied")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error filtering users: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
\ No newline at end of file
@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
 
-
+# Se queda al importar: Settings lee el entorno al definirse. La llamada cuesta ~0.2 ms;
+# el arranque en frio lo dominan las importaciones de librerias (ver benchmarks/README.md)
 load_dotenv()
 
 class Settings:
@@ -16,12 +17,53 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)) 
     DB_SECRET_KEY: str = os.getenv("DB_SECRET_KEY")
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
+    SQL_DEBUG_HEADERS: bool = os.getenv("SQL_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 30))
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_CACHE_MAX_SIZE", 10000))
+    TAG_CACHE_TTL_SECONDS: float = float(os.getenv("TAG_CACHE_TTL_SECONDS", 3600))
+    TAG_CACHE_MAX_SIZE: int = int(os.getenv("TAG_CACHE_MAX_SIZE", 50000))
+    TAG_COUNTS_CACHE_TTL_SECONDS: float = float(os.getenv("TAG_COUNTS_CACHE_TTL_SECONDS", 60))
+    POST_EXCERPT_LENGTH: int = int(os.getenv("POST_EXCERPT_LENGTH", 200))
+    BLIND_INDEX_KEY: str = os.getenv("BLIND_INDEX_KEY") or DB_SECRET_KEY
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # Cache de sentencias compiladas de SQLAlchemy (por engine) y de sentencias preparadas de asyncpg (por conexion);
+    # con PgBouncer en modo transaction el segundo debe ser 0
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 500))
+    # Replica de solo lectura (streaming replication); sin ella las lecturas van a la primaria
+    DB_REPLICA_URL: str = os.getenv("DB_REPLICA_URL")
+    DB_READ_YOUR_WRITES_SECONDS: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 5))
+    DB_READ_YOUR_WRITES_MAX_SIZE: int = int(os.getenv("DB_READ_YOUR_WRITES_MAX_SIZE", 10000))
+    # Esquemas de passlib; el primero se usa para hashes nuevos y los demas se migran en el login
+    PASSWORD_SCHEMES: list = os.getenv("PASSWORD_SCHEMES", "pbkdf2_sha256").split(",")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_MAX_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", 16))
+    USER_DECRYPT_THREAD_MIN_ROWS: int = int(os.getenv("USER_DECRYPT_THREAD_MIN_ROWS", 200))
+    # Control de admision: concurrencia y cola de espera por grupo de rutas
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    ADMISSION_SEARCH_CONCURRENCY: int = int(os.getenv("ADMISSION_SEARCH_CONCURRENCY", 8))
+    ADMISSION_SEARCH_QUEUE_SIZE: int = int(os.getenv("ADMISSION_SEARCH_QUEUE_SIZE", 16))
+    ADMISSION_HEAVY_CONCURRENCY: int = int(os.getenv("ADMISSION_HEAVY_CONCURRENCY", 2))
+    ADMISSION_HEAVY_QUEUE_SIZE: int = int(os.getenv("ADMISSION_HEAVY_QUEUE_SIZE", 4))
+    ADMISSION_DEFAULT_CONCURRENCY: int = int(os.getenv("ADMISSION_DEFAULT_CONCURRENCY", 64))
+    ADMISSION_DEFAULT_QUEUE_SIZE: int = int(os.getenv("ADMISSION_DEFAULT_QUEUE_SIZE", 256))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", 2))
+    ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 1))
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+    WARMUP_POOL_CONNECTIONS: int = int(os.getenv("WARMUP_POOL_CONNECTIONS", 5))
+    WARMUP_TAG_CACHE_SIZE: int = int(os.getenv("WARMUP_TAG_CACHE_SIZE", 1000))
+    WARMUP_TIMEOUT_SECONDS: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", 10))
+    JOB_QUEUE_MAX_SIZE: int = int(os.getenv("JOB_QUEUE_MAX_SIZE", 1000))
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 4))
+    JOB_MAX_RETRIES: int = int(os.getenv("JOB_MAX_RETRIES", 3))
+    JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", 0.5))
+    JOB_DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("JOB_DRAIN_TIMEOUT_SECONDS", 10))
     
 
 settings = Settings()
-print("----ENV DB Settings----")
-print(f"DB_USER: {settings.DB_USER}")
-print(f"DB_PASSWORD: {settings.DB_PASSWORD}")
-print(f"DB_HOST: {settings.DB_HOST}")
-print(f"DB_PORT: {settings.DB_PORT}")
-print(f"DB_DATABASE: {settings.DB_DATABASE}")
@@ -1,27 +1,66 @@
+import time
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
-from app.core.deps import get_db
+from app.core.deps import get_read_sessionmaker
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
+from app.models.user import UserRole
+from app.utils.cache import TTLCache
 from jose import JWTError, jwt
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):   
-    from app.services.user import get_user_by_email
+
+@dataclass(frozen=True)
+class Principal:
+    id: str
+    email: str
+    role: UserRole
+    active: bool
+
+
+# token -> Principal; las entradas nunca sobreviven a la expiracion del token
+principal_cache = TTLCache(
+    "principals",
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: str) -> int:
+    return principal_cache.invalidate(lambda token, principal: principal.id == user_id)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    from app.services.user import get_user_principal
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Not authenticated",
         headers={"WWW-Authenticate": "Bearer"},
-    )    
+    )
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_email: str = payload.get("sub")
         if user_email is None:
-            raise credentials_exception 
-        user = await get_user_by_email(db, email=user_email)
+            raise credentials_exception
+        # Sesion propia y corta: una dependencia con yield viviria hasta el final de un
+        # StreamingResponse y retendria la conexion durante todo el export.
+        # Solo lectura y en la primaria: un usuario recien desactivado no debe seguir entrando
+        # por el retraso de la replica, y los GET no abren una transaccion de escritura
+        async with get_read_sessionmaker(primary=True)() as session:
+            user = await get_user_principal(session, email=user_email)
         if user is None:
-            raise credentials_exception  
+            raise credentials_exception
     except JWTError:
-        raise credentials_exception  
-    return user
\ No newline at end of file
+        raise credentials_exception
+
+    principal = Principal(id=user.id, email=user_email, role=user.role, active=user.active)
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    if payload.get("exp"):
+        ttl = min(ttl, payload["exp"] - time.time())
+    principal_cache.set(token, principal, ttl=ttl)
+    return principal
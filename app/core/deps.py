@@ -1,34 +1,205 @@
+import asyncio
+import time
 from collections.abc import AsyncGenerator
+from typing import Optional
 from sqlalchemy import exc
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from fastapi import Request
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.query_stats import instrument_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import MetaData
 
-load_dotenv()
+DATABASE_URL = f"{settings.DB_DRIVER}://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_DATABASE}"
 
-DATABASE_URL = f"{settings.DB_DRIVER}://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_DATABASE}"         
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    engine = create_async_engine(
-        DATABASE_URL,
-        echo=True,
-        future=True
-    )
-    factory = async_sessionmaker(
-        engine,
-        expire_on_commit=True,
-        future=True
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool que separa la espera de cada checkout del tiempo de abrir conexiones nuevas."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connects = 0
+        self.connect_time_total = 0.0
+        self.connect_time_max = 0.0
+
+    def _create_connection(self):
+        start_time = time.perf_counter()
+        try:
+            record = super()._create_connection()
+        finally:
+            connected = time.perf_counter() - start_time
+            self.connects += 1
+            self.connect_time_total += connected
+            self.connect_time_max = max(self.connect_time_max, connected)
+        # _do_get lo descuenta de la espera: un connect lento no es contencion del pool
+        record.checkout_connect_time = connected
+        return record
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self._record_wait(time.perf_counter() - start_time)
+            raise
+        connected = record.__dict__.pop("checkout_connect_time", 0.0)
+        self._record_wait(max(time.perf_counter() - start_time - connected, 0.0))
+        return record
+
+    def _record_wait(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+
+
+engine: Optional[AsyncEngine] = None
+read_engine: Optional[AsyncEngine] = None
+SessionLocal: Optional[async_sessionmaker] = None
+ReadSessionLocal: Optional[async_sessionmaker] = None
+PrimaryReadSessionLocal: Optional[async_sessionmaker] = None
+
+# Authorization -> marca de escritura reciente; esas lecturas van a la primaria
+recent_writers = TTLCache(
+    "recent_writers",
+    maxsize=settings.DB_READ_YOUR_WRITES_MAX_SIZE,
+    ttl=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def build_engine(url: str) -> AsyncEngine:
+    new_engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
     )
-    
-    async with factory() as session:
+    instrument_engine(new_engine.sync_engine)
+    return new_engine
+
+
+def init_engine() -> AsyncEngine:
+    global engine, read_engine, SessionLocal, ReadSessionLocal, PrimaryReadSessionLocal
+    if engine is None:
+        engine = build_engine(DATABASE_URL)
+        read_engine = build_engine(settings.DB_REPLICA_URL) if settings.DB_REPLICA_URL else engine
+        SessionLocal = async_sessionmaker(
+            engine,
+            expire_on_commit=True,
+        )
+        # Transacciones READ ONLY: una escritura accidental en un GET falla tambien sin replica
+        ReadSessionLocal = async_sessionmaker(
+            read_engine.execution_options(postgresql_readonly=True),
+            expire_on_commit=False,
+        )
+        PrimaryReadSessionLocal = async_sessionmaker(
+            engine.execution_options(postgresql_readonly=True),
+            expire_on_commit=False,
+        )
+    return engine
+
+
+async def dispose_engine() -> None:
+    global engine, read_engine, SessionLocal, ReadSessionLocal, PrimaryReadSessionLocal
+    if read_engine is not None and read_engine is not engine:
+        await read_engine.dispose()
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    read_engine = None
+    SessionLocal = None
+    ReadSessionLocal = None
+    PrimaryReadSessionLocal = None
+
+
+def get_pool_stats() -> dict:
+    if engine is None:
+        return {"initialized": False}
+    stats = pool_stats(engine)
+    if read_engine is not engine:
+        stats["replica"] = pool_stats(read_engine)
+    return stats
+
+
+def pool_stats(target: AsyncEngine) -> dict:
+    pool = target.pool
+    checkouts = pool.checkouts
+    return {
+        "initialized": True,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": checkouts,
+        "wait_time_total": round(pool.wait_time_total, 6),
+        "wait_time_avg": round(pool.wait_time_total / checkouts, 6) if checkouts else 0.0,
+        "wait_time_max": round(pool.wait_time_max, 6),
+        "connects": pool.connects,
+        "connect_time_total": round(pool.connect_time_total, 6),
+        "connect_time_avg": round(pool.connect_time_total / pool.connects, 6) if pool.connects else 0.0,
+        "connect_time_max": round(pool.connect_time_max, 6),
+    }
+
+
+async def ping_database(timeout: float) -> None:
+    if engine is None:
+        init_engine()
+
+    async def ping():
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql("SELECT 1")
+
+    await asyncio.wait_for(ping(), timeout)
+
+
+def get_sessionmaker() -> async_sessionmaker:
+    if SessionLocal is None:
+        init_engine()
+    return SessionLocal
+
+
+def get_read_sessionmaker(primary: bool = False) -> async_sessionmaker:
+    if SessionLocal is None:
+        init_engine()
+    return PrimaryReadSessionLocal if primary else ReadSessionLocal
+
+
+def has_recent_write(request: Request) -> bool:
+    authorization = request.headers.get("authorization")
+    return authorization is not None and recent_writers.get(authorization) is not None
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with get_sessionmaker()() as session:
         try:
             yield session
+            authorization = request.headers.get("authorization")
+            if request.method not in SAFE_METHODS and authorization:
+                # Se marca antes del commit para no dejar ventana hacia la replica
+                recent_writers.set(authorization, True)
             await session.commit()
         except exc.SQLAlchemyError as error:
             await session.rollback()
             raise
-        
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Sin commit: la transaccion de solo lectura se descarta al cerrar la sesion
+    async with get_read_sessionmaker(primary=has_recent_write(request))() as session:
+        yield session
+
 metadata = MetaData()
-Base = declarative_base(metadata=metadata)
\ No newline at end of file
+Base = declarative_base(metadata=metadata)
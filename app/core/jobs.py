@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.utils.metrics import counter, gauge, histogram, registry
+
+logger = logging.getLogger("JobQueue")
+
+JOBS_QUEUE_DEPTH = gauge("jobs_queue_depth", "Trabajos en espera en la cola en segundo plano", ("queue",))
+JOBS_TOTAL = counter("jobs_total", "Trabajos procesados por resultado", ("job", "status"))
+JOB_WAIT = histogram("job_wait_seconds", "Tiempo en cola hasta que un worker toma el trabajo", ("job",))
+JOB_DURATION = histogram("job_duration_seconds", "Duracion de cada trabajo, reintentos incluidos", ("job",))
+
+
+class QueueFull(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class JobQueue:
+    """Cola asyncio acotada con un pool de workers, reintentos y drenado al apagar."""
+
+    def __init__(self, name: str, maxsize: int, workers: int, max_retries: int, retry_backoff: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.accepting = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        # La cola se crea aqui para quedar ligada al event loop de la aplicacion
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{index}")
+            for index in range(self.workers)
+        ]
+        self.accepting = True
+
+    def enqueue(self, name: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        # Sin esperar: si la cola esta llena el llamador decide (p. ej. hacerlo en linea)
+        if not self.accepting:
+            JOBS_TOTAL.inc(name, "rejected")
+            raise QueueFull(f"Queue {self.name} is not accepting jobs")
+        try:
+            self._queue.put_nowait(Job(name, func, args, kwargs))
+        except asyncio.QueueFull:
+            JOBS_TOTAL.inc(name, "rejected")
+            raise QueueFull(f"Queue {self.name} is full")
+
+    async def _run(self, job: Job) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job.func(*job.args, **job.kwargs)
+                JOBS_TOTAL.inc(job.name, "ok")
+                return
+            except Exception as error:
+                if attempt == self.max_retries:
+                    JOBS_TOTAL.inc(job.name, "failed")
+                    logger.exception("Job %s failed after %d attempts: %s", job.name, attempt + 1, error)
+                    return
+                JOBS_TOTAL.inc(job.name, "retry")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            started = time.perf_counter()
+            JOB_WAIT.observe(job.name, value=started - job.enqueued_at)
+            try:
+                await self._run(job)
+            finally:
+                JOB_DURATION.observe(job.name, value=time.perf_counter() - started)
+                self._queue.task_done()
+
+    async def stop(self, timeout: float) -> None:
+        if not self.running:
+            return
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Queue %s stopped with %d pending jobs", self.name, self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "accepting": self.accepting,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "maxsize": self.maxsize,
+            "workers": self.workers,
+        }
+
+
+job_queue = JobQueue(
+    "default",
+    maxsize=settings.JOB_QUEUE_MAX_SIZE,
+    workers=settings.JOB_WORKERS,
+    max_retries=settings.JOB_MAX_RETRIES,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+)
+
+
+@registry.register_collector
+def collect_job_stats() -> None:
+    JOBS_QUEUE_DEPTH.set(job_queue.name, value=job_queue.stats()["depth"])
@@ -1,19 +1,23 @@
 # app/core/security.py
+import hashlib
+import hmac
+import re
 from datetime import datetime, timedelta
+from typing import List
 from jose import JWTError, jwt
-from sqlalchemy_utils import StringEncryptedType
 
 from app.core.config import settings
 
-key = settings.DB_SECRET_KEY
-
 SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-def get_password_hash(password: str) -> str:
-    encrypted_type = StringEncryptedType(key=key).process_bind_param(password, dialect=None)
-    return encrypted_type
+if not settings.BLIND_INDEX_KEY:
+    # Sin clave el HMAC se degradaria a un hash sin secreto de emails y nombres
+    raise RuntimeError("BLIND_INDEX_KEY or DB_SECRET_KEY must be set")
+BLIND_INDEX_KEY = settings.BLIND_INDEX_KEY.encode()
+BLIND_TOKEN_LENGTH = 16
+NGRAM_SIZES = (2, 3)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -31,3 +35,39 @@ def decode_token(token: str) -> dict:
         return payload
     except JWTError:
         return None
+
+
+def blind_index(value: str) -> str:
+    """HMAC deterministico de un valor normalizado, para busquedas exactas sobre columnas cifradas."""
+    normalized = value.strip().lower().encode()
+    return hmac.new(BLIND_INDEX_KEY, normalized, hashlib.sha256).hexdigest()
+
+
+def _blind_token(ngram: str) -> str:
+    return hmac.new(BLIND_INDEX_KEY, ngram.encode(), hashlib.sha256).hexdigest()[:BLIND_TOKEN_LENGTH]
+
+
+def blind_index_tokens(*values: str) -> List[str]:
+    """Tokens (bigramas y trigramas cifrados) de cada palabra de los valores indexados."""
+    ngrams = set()
+    for value in values:
+        for word in re.findall(r"\w+", (value or "").lower()):
+            for size in NGRAM_SIZES:
+                ngrams.update(word[i:i + size] for i in range(len(word) - size + 1))
+    return sorted(_blind_token(ngram) for ngram in ngrams)
+
+
+def blind_search_tokens(keyword: str) -> List[str]:
+    """Tokens que debe contener una fila para que keyword aparezca como subcadena.
+
+    Lanza ValueError si keyword no tiene ninguna palabra indexable (mas corta que el menor n-grama).
+    """
+    ngrams = set()
+    for word in re.findall(r"\w+", keyword.lower()):
+        size = min(len(word), NGRAM_SIZES[-1])
+        if size < NGRAM_SIZES[0]:
+            continue
+        ngrams.update(word[i:i + size] for i in range(len(word) - size + 1))
+    if not ngrams:
+        raise ValueError(f"Search keywords need at least {NGRAM_SIZES[0]} characters: {keyword!r}")
+    return sorted(_blind_token(ngram) for ngram in ngrams)
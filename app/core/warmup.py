@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import time
+from sqlalchemy import exc
+from sqlalchemy.orm import configure_mappers
+from app.core import deps
+from app.core.config import settings
+from app.core.security import create_access_token, decode_token
+from app.services.password import pwd_context
+from app.services.post import get_post, get_post_version, get_posts, get_posts_versions, preload_tag_cache
+from app.services.user import get_user_principal
+
+logger = logging.getLogger("Warmup")
+
+# Claves que no existen: solo interesa compilar y preparar las sentencias
+WARMUP_ID = "__warmup__"
+WARMUP_EMAIL = "warmup@invalid"
+
+
+async def run_hot_statements(session) -> None:
+    await get_post_version(session, WARMUP_ID)
+    await get_post(session, WARMUP_ID)
+    await get_posts_versions(session, offset=0, limit=1)
+    await get_posts(session, offset=0, limit=1)
+    await get_user_principal(session, WARMUP_EMAIL)
+
+
+async def warm_pool(sessionmaker, connections: int) -> None:
+    # Sesiones abiertas a la vez: cada una retiene su conexion, asi se abren `connections` distintas
+    sessions = [sessionmaker() for _ in range(connections)]
+    try:
+        await asyncio.gather(*(run_hot_statements(session) for session in sessions))
+    finally:
+        await asyncio.gather(*(session.close() for session in sessions))
+
+
+async def warm_database(timings: dict) -> None:
+    connections = min(settings.WARMUP_POOL_CONNECTIONS, settings.DB_POOL_SIZE)
+    step = time.perf_counter()
+    await warm_pool(deps.get_read_sessionmaker(primary=True), connections)
+    if deps.read_engine is not deps.engine:
+        await warm_pool(deps.get_read_sessionmaker(), connections)
+    timings["pool_ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    async with deps.get_read_sessionmaker()() as session:
+        timings["tags_cached"] = await preload_tag_cache(session, settings.WARMUP_TAG_CACHE_SIZE)
+    timings["cache_ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+
+async def warm_up() -> dict:
+    timings = {}
+    started = time.perf_counter()
+    configure_mappers()
+    decode_token(create_access_token({"sub": WARMUP_EMAIL}))
+    pwd_context.handler()
+    timings["mappers_jwt_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    try:
+        await asyncio.wait_for(warm_database(timings), settings.WARMUP_TIMEOUT_SECONDS)
+    except (exc.SQLAlchemyError, OSError, asyncio.TimeoutError) as error:
+        # Sin base de datos se arranca igual; /health/ready lo reporta
+        logger.warning("Database warm-up skipped: %r", error)
+
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info("Warm-up finished: %s", timings)
+    return timings
@@ -1,17 +1,53 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from app.utils.admission import AdmissionControlMiddleware
 from app.utils.timing_middleware import TimingMiddleware
 from app.api.auth import router as auth_router
 from app.api.user import router as user_router
 from app.api.post import router as post_router
+from app.api.tag import router as tag_router
+from app.api.health import router as health_router
+from app.core.config import settings
+from app.core.deps import init_engine, dispose_engine
+from app.core.jobs import job_queue
+from app.core.warmup import warm_up
+from app.services.password import shutdown_password_pool
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    _app.state.ready = False
+    init_engine()
+    await job_queue.start()
+    if settings.WARMUP_ENABLED:
+        await warm_up()
+    _app.state.ready = True
+    yield
+    # Deja de recibir trafico nuevo antes de drenar
+    _app.state.ready = False
+    # Primero se drenan los trabajos pendientes: aun necesitan el engine
+    await job_queue.stop(settings.JOB_DRAIN_TIMEOUT_SECONDS)
+    shutdown_password_pool()
+    await dispose_engine()
+
 
 def get_app() -> FastAPI:
     _app = FastAPI(
-        title="Users, Post y Tags"
+        title="Users, Post y Tags",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )    
     _app.include_router(auth_router, prefix="/api/v1/auth", tags=["Autorizacion"])
     _app.include_router(user_router, prefix="/api/v1/users", tags=["Usuários"])
     _app.include_router(post_router, prefix="/api/v1/posts", tags=["Post"])
+    _app.include_router(tag_router, prefix="/api/v1/tags", tags=["Tags"])
+    _app.include_router(health_router, tags=["Health"])
+    # La ultima agregada queda por fuera: Timing > CORS > Admission, asi los 503 llevan CORS y se miden
+    _app.add_middleware(
+        AdmissionControlMiddleware
+    )
     _app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
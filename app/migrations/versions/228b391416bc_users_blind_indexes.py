@@ -0,0 +1,73 @@
+"""Users blind indexes
+
+Revision ID: 228b391416bc
+Revises: 269abb035d81
+Create Date: 2026-10-18 11:40:05.532190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy_utils import StringEncryptedType
+
+from app.core.config import settings
+from app.core.security import blind_index, blind_index_tokens
+
+
+# revision identifiers, used by Alembic.
+revision = '228b391416bc'
+down_revision = '269abb035d81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('email_hash', sa.String(length=64), nullable=True))
+    op.add_column(
+        'users',
+        sa.Column('search_tokens', postgresql.ARRAY(sa.String(length=16)), nullable=False, server_default='{}')
+    )
+
+    # Backfill: se descifran los usuarios existentes para calcular sus indices
+    users = sa.table(
+        'users',
+        sa.column('id', sa.String),
+        sa.column('name_complete', StringEncryptedType(sa.String(200), settings.DB_SECRET_KEY)),
+        sa.column('email', StringEncryptedType(sa.String(200), settings.DB_SECRET_KEY)),
+        sa.column('email_hash', sa.String),
+        sa.column('search_tokens', postgresql.ARRAY(sa.String)),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(users.c.id, users.c.name_complete, users.c.email)).all()
+
+    # blind_index normaliza a minusculas: emails que solo difieren en mayusculas romperian el
+    # indice unico con un error poco claro, asi que se detectan antes y se aborta con los ids
+    ids_by_hash = {}
+    for row in rows:
+        ids_by_hash.setdefault(blind_index(row.email), []).append(row.id)
+    collisions = [ids for ids in ids_by_hash.values() if len(ids) > 1]
+    if collisions:
+        raise RuntimeError(
+            "Users whose emails differ only by case or surrounding spaces must be merged or "
+            f"renamed before this migration: {collisions}"
+        )
+
+    for row in rows:
+        bind.execute(
+            users.update()
+            .where(users.c.id == row.id)
+            .values(
+                email_hash=blind_index(row.email),
+                search_tokens=blind_index_tokens(row.name_complete, row.email),
+            )
+        )
+
+    op.create_index('ix_users_email_hash', 'users', ['email_hash'], unique=True)
+    op.create_index('ix_users_search_tokens', 'users', ['search_tokens'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_users_search_tokens', table_name='users')
+    op.drop_index('ix_users_email_hash', table_name='users')
+    op.drop_column('users', 'search_tokens')
+    op.drop_column('users', 'email_hash')
@@ -0,0 +1,106 @@
+"""Posts full text search
+
+Revision ID: 269abb035d81
+Revises: c52fc8f78f91
+Create Date: 2026-10-18 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '269abb035d81'
+down_revision = 'c52fc8f78f91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('posts', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # El vector se arma con el titulo (A), los nombres de tags (B) y el contenido (C)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION posts_search_vector_refresh() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce((
+                    SELECT string_agg(t.name, ' ')
+                    FROM post_tags pt JOIN tags t ON t.id = pt.tag_id
+                    WHERE pt.post_id = NEW.id
+                ), '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER posts_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, content ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_search_vector_refresh();
+    """)
+
+    # Cambios en post_tags y en tags.name vuelven a calcular el vector de los posts afectados
+    op.execute("""
+        CREATE OR REPLACE FUNCTION post_tags_search_vector_touch() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE posts SET title = title WHERE id IN (SELECT DISTINCT post_id FROM changed_rows_new);
+            ELSE
+                UPDATE posts SET title = title WHERE id IN (SELECT DISTINCT post_id FROM changed_rows_old);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER post_tags_search_vector_insert
+        AFTER INSERT ON post_tags
+        REFERENCING NEW TABLE AS changed_rows_new
+        FOR EACH STATEMENT EXECUTE FUNCTION post_tags_search_vector_touch();
+    """)
+    op.execute("""
+        CREATE TRIGGER post_tags_search_vector_delete
+        AFTER DELETE ON post_tags
+        REFERENCING OLD TABLE AS changed_rows_old
+        FOR EACH STATEMENT EXECUTE FUNCTION post_tags_search_vector_touch();
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tags_search_vector_touch() RETURNS trigger AS $$
+        BEGIN
+            UPDATE posts SET title = title
+            WHERE id IN (SELECT post_id FROM post_tags WHERE tag_id = NEW.id);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER tags_search_vector_update
+        AFTER UPDATE OF name ON tags
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION tags_search_vector_touch();
+    """)
+
+    # Backfill de los posts existentes
+    op.execute("UPDATE posts SET title = title")
+
+    op.create_index(
+        'ix_posts_search_vector',
+        'posts',
+        ['search_vector'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_posts_search_vector', table_name='posts')
+    op.execute("DROP TRIGGER IF EXISTS tags_search_vector_update ON tags")
+    op.execute("DROP TRIGGER IF EXISTS post_tags_search_vector_delete ON post_tags")
+    op.execute("DROP TRIGGER IF EXISTS post_tags_search_vector_insert ON post_tags")
+    op.execute("DROP TRIGGER IF EXISTS posts_search_vector_update ON posts")
+    op.execute("DROP FUNCTION IF EXISTS tags_search_vector_touch()")
+    op.execute("DROP FUNCTION IF EXISTS post_tags_search_vector_touch()")
+    op.execute("DROP FUNCTION IF EXISTS posts_search_vector_refresh()")
+    op.drop_column('posts', 'search_vector')
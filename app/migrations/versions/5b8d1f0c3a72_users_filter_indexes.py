@@ -0,0 +1,32 @@
+"""Users filter indexes
+
+Revision ID: 5b8d1f0c3a72
+Revises: e7c6685f517b
+Create Date: 2026-10-18 16:20:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8d1f0c3a72'
+down_revision = 'e7c6685f517b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE/DROP INDEX CONCURRENTLY no puede correr dentro de una transaccion
+    with op.get_context().autocommit_block():
+        # /users/filter sin search lista activos e inactivos: ORDER BY created_at, id sin filtro de active.
+        # Tambien permite contar el total con un Index Only Scan en lugar de recorrer la tabla.
+        op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], postgresql_concurrently=True)
+        # Palabras que coinciden con un rol: role IN (...) se combina con el GIN de search_tokens en un BitmapOr
+        op.create_index('ix_users_role', 'users', ['role'], postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_role', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_created_at_id', table_name='users', postgresql_concurrently=True)
@@ -0,0 +1,62 @@
+"""Hot path indexes
+
+Revision ID: e7c6685f517b
+Revises: 228b391416bc
+Create Date: 2026-10-18 11:05:27.392810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c6685f517b'
+down_revision = '228b391416bc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE/DROP INDEX CONCURRENTLY no puede correr dentro de una transaccion
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_user_id', 'posts', ['user_id'], postgresql_concurrently=True)
+        # post_tags ya tiene (post_id, tag_id) como PK; este cubre la busqueda inversa por tag
+        op.create_index(
+            'ix_post_tags_tag_id_post_id', 'post_tags', ['tag_id', 'post_id'], postgresql_concurrently=True
+        )
+        # Listado y paginacion por cursor de posts vivos: WHERE deleted = false ORDER BY created_at, id
+        op.create_index(
+            'ix_posts_live_created_at_id',
+            'posts',
+            ['created_at', 'id'],
+            postgresql_where=sa.text('deleted = false'),
+            postgresql_concurrently=True
+        )
+        # Listado de usuarios activos: WHERE active = true ORDER BY created_at, id
+        op.create_index(
+            'ix_users_active_created_at_id',
+            'users',
+            ['created_at', 'id'],
+            postgresql_where=sa.text('active = true'),
+            postgresql_concurrently=True
+        )
+
+        # La migracion inicial dejo ix_posts_title como UNIQUE; el modelo no lo exige.
+        # Se construye el indice nuevo antes de quitar el viejo para no quedar sin indice.
+        op.create_index('ix_posts_title_tmp', 'posts', ['title'], postgresql_concurrently=True)
+        op.execute("ALTER TABLE posts DROP CONSTRAINT IF EXISTS posts_title_key")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_posts_title")
+        op.execute("ALTER INDEX ix_posts_title_tmp RENAME TO ix_posts_title")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        # Falla si ya hay titulos repetidos: hay que resolverlos antes de bajar
+        op.create_index('ix_posts_title_tmp', 'posts', ['title'], unique=True, postgresql_concurrently=True)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_posts_title")
+        op.execute("ALTER INDEX ix_posts_title_tmp RENAME TO ix_posts_title")
+
+        op.drop_index('ix_users_active_created_at_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_posts_live_created_at_id', table_name='posts', postgresql_concurrently=True)
+        op.drop_index('ix_post_tags_tag_id_post_id', table_name='post_tags', postgresql_concurrently=True)
+        op.drop_index('ix_posts_user_id', table_name='posts', postgresql_concurrently=True)
@@ -1,9 +1,10 @@
 # app/models/book.py
 from app.core.deps import Base
 from app.core.config import settings
-from sqlalchemy import Boolean, Column, ForeignKey, String, Table, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, String, Table, Text, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from nanoid import generate
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, query_expression, relationship
 from app.utils.mixins import SoftDeleteMixin, TimestampMixin
 
 key = settings.DB_SECRET_KEY
@@ -12,7 +13,8 @@ post_tags = Table(
     "post_tags",
     Base.metadata,
     Column("post_id", String(30), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True),
-    Column("tag_id", String(30), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    Column("tag_id", String(30), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id")
 )
 
 class Post(Base, SoftDeleteMixin, TimestampMixin):
@@ -22,14 +24,24 @@ class Post(Base, SoftDeleteMixin, TimestampMixin):
     title = Column(String(200), index=True, nullable=False)    
     content = Column(Text)
     deleted = Column(Boolean, default=False)          
-    user_id = Column(String(30), ForeignKey("users.id"), nullable=False)
+    user_id = Column(String(30), ForeignKey("users.id"), nullable=False, index=True)
+    # Mantenido por triggers en la base de datos (titulo, contenido y nombres de tags)
+    search_vector = deferred(Column(TSVECTOR))
+    # Solo se carga en los listados resumidos (with_expression); si no, queda en None
+    excerpt = query_expression()
     user = relationship("User", back_populates="posts")        
     tags = relationship(
         'Tag',
         secondary=post_tags,
+        back_populates="posts",
         lazy="selectin"  # Uso de selectin para carga diferida explícita
     )
 
+    __table_args__ = (
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_posts_live_created_at_id", "created_at", "id", postgresql_where=text("deleted = false")),
+    )
+
 class Tag(Base, TimestampMixin):
     __tablename__ = "tags"
 
@@ -38,6 +50,7 @@ class Tag(Base, TimestampMixin):
     posts = relationship(
         'Post',
         secondary=post_tags,
-        lazy="selectin",
+        # Cargar los posts de cada tag en cascada multiplicaba las consultas: solo carga explicita
+        lazy="raise",
         back_populates="tags"
     )
\ No newline at end of file
@@ -1,10 +1,12 @@
 from app.core.deps import Base
 from app.core.config import settings
 from enum import Enum as PyEnum
-from sqlalchemy import Boolean, Column, String, Enum
+from sqlalchemy import Boolean, Column, String, Enum, Index, event, inspect, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from nanoid import generate
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy_utils import StringEncryptedType
+from app.core.security import blind_index, blind_index_tokens
 from app.utils.mixins import TimestampMixin
 
 key = settings.DB_SECRET_KEY
@@ -21,9 +23,31 @@ class User(Base, TimestampMixin):
     id = Column(String(30), primary_key=True, default=generate)
     name_complete = Column(StringEncryptedType(String(200), key), nullable=False)
     email = Column(StringEncryptedType(String(200), key), unique=True, index=True, nullable=False)
-    password = Column(StringEncryptedType(String(200), key), nullable=False)
+    # Solo el login lo necesita: se carga con undefer y acceder sin cargarlo falla en vez de hacer I/O implicito
+    password = deferred(Column(StringEncryptedType(String(200), key), nullable=False), raiseload=True)
     role = Column(Enum(UserRole), nullable=False)
     active = Column(Boolean, nullable=False, default=True)   
     posts = relationship("Post", back_populates="user")
-    
-    
\ No newline at end of file
+    # Blind indexes: permiten buscar sobre email y name_complete sin descifrar
+    email_hash = Column(String(64), unique=True, index=True)
+    search_tokens = Column(ARRAY(String(16)), nullable=False, default=list)
+
+    __table_args__ = (
+        Index("ix_users_search_tokens", "search_tokens", postgresql_using="gin"),
+        Index("ix_users_active_created_at_id", "created_at", "id", postgresql_where=text("active = true")),
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role", "role"),
+    )
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def refresh_blind_indexes(mapper, connection, target: User):
+    state = inspect(target)
+    changed = (
+        state.attrs.email.history.has_changes()
+        or state.attrs.name_complete.history.has_changes()
+    )
+    if changed or target.email_hash is None:
+        target.email_hash = blind_index(target.email)
+        target.search_tokens = blind_index_tokens(target.name_complete, target.email)
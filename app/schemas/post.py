@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, conlist
 from typing import List, Optional
 from app.schemas.tag import TagResponse
 
@@ -25,3 +25,37 @@ class PostResponse(PostBase):
 
     class Config:
         orm_mode = True
+
+
+class PostCursorPage(BaseModel):
+    posts: List[PostResponse]
+    next_cursor: Optional[str]
+
+
+MAX_BULK_POSTS = 1000
+
+
+class PostBulkCreate(BaseModel):
+    posts: conlist(PostCreate, min_items=1, max_items=MAX_BULK_POSTS)
+
+
+class PostBulkItemResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[str]
+    error: Optional[str]
+
+
+class PostBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[PostBulkItemResult]
+
+
+class PostBulkDelete(BaseModel):
+    ids: conlist(str, min_items=1, max_items=MAX_BULK_POSTS)
+
+
+class PostBulkDeleteResponse(BaseModel):
+    deleted: List[str]
+    not_found: List[str]
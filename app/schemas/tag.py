@@ -10,4 +10,7 @@ class TagResponse(TagBase):
     id: str    
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class TagCountResponse(TagResponse):
+    post_count: int
@@ -1,7 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 class UserRole(str, Enum):
     admin = "admin"
@@ -36,4 +36,8 @@ class UserResponse(UserBase):
     id: Optional[str]     
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class UserCursorPage(BaseModel):
+    users: List[UserResponse]
+    next_cursor: Optional[str]
@@ -0,0 +1,49 @@
+import asyncio
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from app.core.config import settings
+
+# Hashes lentos a proposito: nunca se calculan en el event loop
+pwd_context = CryptContext(schemes=settings.PASSWORD_SCHEMES, deprecated="auto")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_pool() -> Tuple[ThreadPoolExecutor, asyncio.Semaphore]:
+    global _executor, _semaphore
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+        # Limita el trabajo pendiente en el pool: un pico de logins no acapara CPU ni memoria
+        _semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+    return _executor, _semaphore
+
+
+async def _run(function, *args):
+    executor, semaphore = _get_pool()
+    async with semaphore:
+        return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(password: str, stored: str) -> Tuple[bool, Optional[str]]:
+    """Devuelve (valida, nuevo_hash); nuevo_hash no es None cuando hay que migrar lo guardado."""
+    if pwd_context.identify(stored, required=False) is None:
+        # Legado: contraseña guardada en claro (solo cifrada en la columna); se migra al acertar
+        if not hmac.compare_digest(password.encode(), stored.encode()):
+            return False, None
+        return True, await hash_password(password)
+    return await _run(pwd_context.verify_and_update, password, stored)
+
+
+def shutdown_password_pool() -> None:
+    global _executor, _semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _semaphore = None
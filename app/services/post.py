@@ -1,147 +1,463 @@
+import re
+from datetime import datetime
 from fastapi import Query
+import pytz
+from nanoid import generate
+from sqlalchemy import event, func, insert, lambda_stmt, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload, selectinload, subqueryload
-from app.models.post import Post, Tag
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.core.deps import get_sessionmaker
+from app.core.jobs import QueueFull, job_queue
+from app.models.post import Post, Tag, post_tags
 from app.schemas.post import PostCreate, PostUpdate, PostResponse
-from typing import List, Optional
+from app.schemas.tag import TagResponse
+from app.services.statements import post_by_id, post_content_options, posts_page, posts_versions_page
+from app.utils.cache import TTLCache
+from app.utils.serializers import serialize_post
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-async def get_posts(db: AsyncSession, offset: int, limit: int) -> List[Post]:
-    query = (
-        select(Post)
-        .where(Post.deleted == False)
-        .options(joinedload(Post.tags))
-        .offset(offset)
-        .limit(limit)
-    )
-    result = await db.execute(query)
-    posts = result.unique().scalars().all()  
+BULK_CHUNK_SIZE = 1000
+EXPORT_BATCH_SIZE = 500
+PENDING_TAG_IDS = "pending_tag_ids"
+
+# Columnas devueltas por los RETURNING de escritura (sin search_vector)
+POST_COLUMNS = (
+    Post.id,
+    Post.title,
+    Post.content,
+    Post.user_id,
+    Post.deleted,
+    Post.created_at,
+    Post.updated_at,
+)
+
+# nombre -> id de los tags usados recientemente
+tag_id_cache = TTLCache(
+    "tag_ids",
+    maxsize=settings.TAG_CACHE_MAX_SIZE,
+    ttl=settings.TAG_CACHE_TTL_SECONDS,
+)
+
+# (sort, limit) -> conteos de posts por tag; se acepta que esten desfasados hasta el TTL
+tag_counts_cache = TTLCache(
+    "tag_counts",
+    maxsize=64,
+    ttl=settings.TAG_COUNTS_CACHE_TTL_SECONDS,
+)
+
+def content_projection(fields: Optional[Sequence[str]]) -> Tuple[bool, Optional[int]]:
+    # (se lee content, largo del extracto o None); fields None es la representacion completa
+    if fields is None:
+        return True, None
+    excerpt_length = settings.POST_EXCERPT_LENGTH if "excerpt" in fields else None
+    return "content" in fields, excerpt_length
+
+
+async def get_posts(
+    db: AsyncSession,
+    offset: int,
+    limit: int,
+    after: Optional[Tuple[datetime, str]] = None,
+    fields: Optional[Sequence[str]] = None
+) -> List[Post]:
+    with_content, excerpt_length = content_projection(fields)
+    result = await db.execute(posts_page(offset, limit, after, with_content, excerpt_length))
+    posts = result.scalars().all()  
     return posts
 
-async def create_post(db: AsyncSession, post_data: PostCreate) -> Optional[PostResponse]:    
-    new_post = Post(
-        title=post_data.title,
-        content=post_data.content,
-        deleted=False,
-        user_id=post_data.user_id
+
+async def get_posts_versions(
+    db: AsyncSession,
+    offset: int,
+    limit: int,
+    after: Optional[Tuple[datetime, str]] = None
+) -> list:
+    result = await db.execute(posts_versions_page(offset, limit, after))
+    return result.all()
+
+def build_post_response(row, tags: List[TagResponse], updated_at: Optional[datetime] = None) -> PostResponse:
+    return PostResponse(
+        id=row.id,
+        title=row.title,
+        content=row.content,
+        user_id=row.user_id,
+        deleted=row.deleted,
+        created_at=row.created_at,
+        updated_at=updated_at or row.updated_at,
+        tags=tags,
     )
-    db.add(new_post)
+
+
+def tag_responses(tag_ids: Dict[str, str]) -> List[TagResponse]:
+    return [TagResponse(id=tag_id, name=name) for name, tag_id in tag_ids.items()]
+
+
+async def link_deferred_tags(db: AsyncSession, post_id: str, tag_names: List[str]) -> Tuple[Dict[str, str], datetime]:
+    """Enlaza los tags y devuelve ({nombre: id}, nuevo updated_at)."""
+    tag_ids = await get_or_create_tags(db, tag_names)
+    await link_post_tags(db, post_id, tag_ids.values())
+    # Los ETags salen de (id, updated_at): sin tocarlo los clientes seguirian recibiendo 304 sin los tags
+    updated_at = datetime.now(pytz.utc)
+    await db.execute(update(Post.__table__).where(Post.id == post_id).values(updated_at=updated_at))
     await db.commit()
-    await db.refresh(new_post)
-    
-    if post_data.tag_names:
-        tags = await get_or_create_tags(db, post_data.tag_names)
-        new_post.tags.extend(tags)
-        
+    return tag_ids, updated_at
+
+
+async def apply_post_tags(post_id: str, tag_names: List[str]) -> None:
+    # Trabajo en segundo plano: sesion propia e idempotente (ON CONFLICT) para poder reintentarse
+    async with get_sessionmaker()() as session:
+        await link_deferred_tags(session, post_id, tag_names)
+
+
+async def defer_post_tags(
+    db: AsyncSession,
+    post_id: str,
+    tag_names: List[str]
+) -> Optional[Tuple[Dict[str, str], datetime]]:
+    """None si quedo encolado; si se enlazo en linea, lo mismo que link_deferred_tags."""
+    try:
+        job_queue.enqueue("apply_post_tags", apply_post_tags, post_id, list(tag_names))
+        return None
+    except QueueFull:
+        # Contrapresion: con la cola llena los tags se enlazan en la propia peticion
+        return await link_deferred_tags(db, post_id, tag_names)
+
+
+async def create_post(db: AsyncSession, post_data: PostCreate, defer_tags: bool = False) -> Optional[PostResponse]:    
+    tag_ids = {}
+    if post_data.tag_names and not defer_tags:
+        tag_ids = await get_or_create_tags(db, post_data.tag_names)
+
+    now = datetime.now(pytz.utc)
+    result = await db.execute(
+        insert(Post.__table__)
+        .values(
+            id=generate(),
+            title=post_data.title,
+            content=post_data.content,
+            deleted=False,
+            user_id=post_data.user_id,
+            created_at=now,
+            updated_at=now,
+        )
+        .returning(*POST_COLUMNS)
+    )
+    row = result.one()
+    await link_post_tags(db, row.id, tag_ids.values())
     await db.commit()
-    await db.refresh(new_post)
-    
-    stmt = select(Post).options(selectinload(Post.tags)).where(Post.id == new_post.id)
-    result = await db.execute(stmt)
-    new_post = result.scalar_one_or_none()
-    
-    return new_post 
+
+    if post_data.tag_names and defer_tags:
+        linked = await defer_post_tags(db, row.id, post_data.tag_names)
+        if linked is None:
+            # Los tags se ven en la siguiente lectura, una vez procesado el trabajo
+            return build_post_response(row, [])
+        tag_ids, updated_at = linked
+        return build_post_response(row, tag_responses(tag_ids), updated_at)
+    return build_post_response(row, tag_responses(tag_ids))
     
-async def get_or_create_tags(db: AsyncSession, tag_names: list) -> list:      
-    existing_tags = await db.execute(select(Tag).where(Tag.name.in_(tag_names)))
-    existing_tags = {tag.name: tag for tag in existing_tags.scalars().all()}
-
-    new_tags = []
-    for name in tag_names:
-        if name not in existing_tags:
-            new_tag = Tag(name=name)
-            db.add(new_tag)
-            new_tags.append(new_tag)
-            
-    return list(existing_tags.values()) + new_tags
+async def get_or_create_tags(db: AsyncSession, tag_names: list) -> Dict[str, str]:
+    """Devuelve {nombre: id}, creando los tags que falten sin competir por el indice unico."""
+    names = list(dict.fromkeys(tag_names))
+    tag_ids = {}
+    missing = []
+    for name in names:
+        tag_id = tag_id_cache.get(name)
+        if tag_id is None:
+            missing.append(name)
+        else:
+            tag_ids[name] = tag_id
+    if not missing:
+        return tag_ids
+
+    # Orden estable de insercion para evitar deadlocks entre transacciones concurrentes
+    now = datetime.now(pytz.utc)
+    stmt = (
+        pg_insert(Tag)
+        .values([
+            {"id": generate(), "name": name, "created_at": now, "updated_at": now}
+            for name in sorted(missing)
+        ])
+        .on_conflict_do_nothing(index_elements=[Tag.name])
+        .returning(Tag.id, Tag.name)
+    )
+    created = {row.name: row.id for row in await db.execute(stmt)}
+
+    existing = {}
+    remaining = [name for name in missing if name not in created]
+    if remaining:
+        result = await db.execute(select(Tag.id, Tag.name).where(Tag.name.in_(remaining)))
+        existing = {row.name: row.id for row in result}
+        for name, tag_id in existing.items():
+            tag_id_cache.set(name, tag_id)
+
+    # Los tags nuevos solo se cachean si la transaccion que los crea hace commit
+    db.sync_session.info.setdefault(PENDING_TAG_IDS, {}).update(created)
+
+    tag_ids.update(created)
+    tag_ids.update(existing)
+    return tag_ids
+
+
+@event.listens_for(Session, "after_commit")
+def publish_pending_tag_ids(session: Session):
+    for name, tag_id in session.info.pop(PENDING_TAG_IDS, {}).items():
+        tag_id_cache.set(name, tag_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_pending_tag_ids(session: Session):
+    session.info.pop(PENDING_TAG_IDS, None)
+
+
+async def preload_tag_cache(db: AsyncSession, limit: int) -> int:
+    # Arranque en caliente: los tags mas recientes son los que mas se reutilizan
+    result = await db.execute(select(Tag.id, Tag.name).order_by(Tag.created_at.desc()).limit(limit))
+    rows = result.all()
+    for tag_id, name in rows:
+        tag_id_cache.set(name, tag_id)
+    return len(rows)
+
+
+async def link_post_tags(db: AsyncSession, post_id: str, tag_ids) -> None:
+    rows = [{"post_id": post_id, "tag_id": tag_id} for tag_id in tag_ids]
+    if rows:
+        await db.execute(pg_insert(post_tags).values(rows).on_conflict_do_nothing())
+
+def validate_bulk_post(post_data: PostCreate) -> Optional[str]:
+    if not post_data.title or not post_data.title.strip():
+        return "title is required"
+    if len(post_data.title) > Post.title.type.length:
+        return f"title exceeds {Post.title.type.length} characters"
+    for name in post_data.tag_names or []:
+        if not name or len(name) > Tag.name.type.length:
+            return f"invalid tag name: {name!r}"
+    return None
+
+
+async def insert_in_chunks(db: AsyncSession, table, rows: List[dict], chunk_size: int = BULK_CHUNK_SIZE) -> None:
+    # Un INSERT multi-fila por bloque, para no superar el limite de parametros de Postgres
+    for start in range(0, len(rows), chunk_size):
+        await db.execute(insert(table).values(rows[start:start + chunk_size]))
+
+
+async def create_posts_bulk(db: AsyncSession, posts_data: List[PostCreate], user_id: str) -> dict:
+    now = datetime.now(pytz.utc)
+    results = []
+    post_rows = []
+    post_tag_names = []
+
+    for index, post_data in enumerate(posts_data):
+        error = validate_bulk_post(post_data)
+        if error:
+            results.append({"index": index, "status": "error", "id": None, "error": error})
+            continue
+        post_id = generate()
+        post_rows.append({
+            "id": post_id,
+            "title": post_data.title,
+            "content": post_data.content,
+            "deleted": False,
+            "user_id": user_id,
+            "created_at": now,
+            "updated_at": now,
+        })
+        post_tag_names.append((post_id, list(dict.fromkeys(post_data.tag_names or []))))
+        results.append({"index": index, "status": "created", "id": post_id, "error": None})
+
+    if post_rows:
+        # Todos los tags del lote se resuelven una sola vez
+        all_tag_names = list(dict.fromkeys(name for _, names in post_tag_names for name in names))
+        tag_ids = {}
+        if all_tag_names:
+            tag_ids = await get_or_create_tags(db, all_tag_names)
+
+        await insert_in_chunks(db, Post.__table__, post_rows)
+        links = [
+            {"post_id": post_id, "tag_id": tag_ids[name]}
+            for post_id, names in post_tag_names
+            for name in names
+        ]
+        if links:
+            await insert_in_chunks(db, post_tags, links)
+        await db.commit()
+
+    created = len(post_rows)
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results,
+    }
+
+
+async def stream_posts(
+    db: AsyncSession,
+    since: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> AsyncIterator[Post]:
+    # Cursor del lado del servidor: se leen batch_size filas por vez, la memoria no crece con la tabla
+    query = (
+        select(Post)
+        .where(Post.deleted == False)
+        .options(selectinload(Post.tags))
+        .order_by(Post.created_at, Post.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if since is not None:
+        query = query.where(Post.updated_at >= since)
+    result = await db.stream_scalars(query)
+    async for post in result:
+        yield post
 
 async def get_post(db: AsyncSession, post_id: str) -> Post:
-    result = await db.execute(select(Post).where(Post.id == post_id, Post.deleted == False).options(joinedload(Post.tags)))
+    result = await db.execute(post_by_id(post_id))
     return result.scalars().first()
 
-async def update_post(db: AsyncSession, post_id: str, post_data: PostUpdate) -> Optional[Post]:
-    db_post = await get_post(db, post_id)
-    
-    if db_post:
-        db_post.title = post_data.title
-        db_post.content = post_data.content
-        
-        db.add(db_post)
-        await db.commit()
-        await db.refresh(db_post)
+async def get_post_version(db: AsyncSession, post_id: str):
+    result = await db.execute(select(Post.id, Post.updated_at).where(Post.id == post_id, Post.deleted == False))
+    return result.one_or_none()
 
-        if post_data.tag_names:
-            tags = await get_or_create_tags(db, post_data.tag_names)
-            db_post.tags.extend(tags)
+async def update_post(
+    db: AsyncSession,
+    post_id: str,
+    post_data: PostUpdate,
+    user_id: Optional[str] = None,
+    defer_tags: bool = False
+) -> Optional[PostResponse]:
+    conditions = [Post.id == post_id, Post.deleted == False]
+    if user_id is not None:
+        conditions.append(Post.user_id == user_id)
+
+    # Los tags actuales vuelven en el mismo RETURNING (se evalua antes de agregar los nuevos)
+    current_tags = (
+        select(func.json_agg(func.json_build_object("id", Tag.id, "name", Tag.name)))
+        .select_from(post_tags.join(Tag, Tag.id == post_tags.c.tag_id))
+        .where(post_tags.c.post_id == Post.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(Post.__table__)
+        .where(*conditions)
+        .values(
+            title=post_data.title,
+            content=post_data.content,
+            updated_at=datetime.now(pytz.utc),
+        )
+        .returning(*POST_COLUMNS, current_tags.label("current_tags"))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
 
+    tags = {tag["name"]: tag["id"] for tag in row.current_tags or []}
+    new_tag_names = [name for name in post_data.tag_names or [] if name not in tags]
+    if new_tag_names and defer_tags:
         await db.commit()
-        await db.refresh(db_post)
-        
-        stmt = select(Post).options(selectinload(Post.tags)).where(Post.id == db_post.id)
-        result = await db.execute(stmt)
-        db_post = result.scalar_one_or_none()
-        
-        return db_post
-    else:
-        return None  
+        linked = await defer_post_tags(db, post_id, new_tag_names)
+        if linked is None:
+            return build_post_response(row, tag_responses(tags))
+        tag_ids, updated_at = linked
+        tags.update(tag_ids)
+        return build_post_response(row, tag_responses(tags), updated_at)
+
+    if new_tag_names:
+        # Los tags que el post ya tiene vienen en el RETURNING: solo se resuelven los nuevos
+        tag_ids = await get_or_create_tags(db, new_tag_names)
+        await link_post_tags(db, post_id, tag_ids.values())
+        tags.update(tag_ids)
+    await db.commit()
+
+    return build_post_response(row, tag_responses(tags))
 
 async def delete_post(db: AsyncSession, post_id: str) -> bool:
-    db_post = await get_post(db, post_id)
-    if db_post:
-        await Post.soft_delete(db, post_id)  
-        #for tag in db_post.tags:
-        #    await Tag.soft_delete(db, tag.id)        
-        await db.commit()
-        return True
-    return False
+    deleted = await delete_posts(db, [post_id])
+    return bool(deleted)
+
+async def delete_posts(db: AsyncSession, post_ids: List[str]) -> List[str]:
+    deleted = await Post.soft_delete_many(db, post_ids)
+    await db.commit()
+    return deleted
 
 async def get_all_tags(db: AsyncSession) -> List[Tag]:
-    result = await db.execute(select(Tag).where(Tag.deleted == False))
+    result = await db.execute(select(Tag).order_by(Tag.name))
     return result.scalars().all()
 
 
+async def get_tag_counts(
+    db: AsyncSession,
+    sort: str = "count",
+    limit: Optional[int] = None,
+    cached: bool = False
+) -> List[dict]:
+    key = (sort, limit)
+    if cached:
+        counts = tag_counts_cache.get(key)
+        if counts is not None:
+            return counts
+
+    # Un solo GROUP BY sobre post_tags; los tags sin posts activos salen con 0
+    counts_query = (
+        select(post_tags.c.tag_id, func.count().label("post_count"))
+        .join(Post, Post.id == post_tags.c.post_id)
+        .where(Post.deleted == False)
+        .group_by(post_tags.c.tag_id)
+        .subquery()
+    )
+    post_count = func.coalesce(counts_query.c.post_count, 0).label("post_count")
+    query = select(Tag.id, Tag.name, post_count).outerjoin(
+        counts_query, counts_query.c.tag_id == Tag.id
+    )
+    if sort == "count":
+        query = query.order_by(post_count.desc(), Tag.name)
+    else:
+        query = query.order_by(Tag.name)
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
+    counts = [dict(row) for row in result.mappings()]
+    if cached:
+        tag_counts_cache.set(key, counts)
+    return counts
+
+
+def build_search_query(search: Optional[str]) -> Optional[str]:
+    # Cada palabra se busca como prefijo y basta con que coincida una de ellas
+    keywords = re.findall(r"\w+", search.lower()) if search else []
+    if not keywords:
+        return None
+    return " | ".join(f"{keyword}:*" for keyword in dict.fromkeys(keywords))
+
+
 async def filter_posts(
     db: AsyncSession,
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-    search: Optional[str] = Query(default=None)        
+    search: Optional[str] = Query(default=None),
+    fields: Optional[Sequence[str]] = None
 ) -> dict:
-    
-    result = await db.execute(select(Post).options(subqueryload(Post.tags)).filter(Post.deleted == False))
-    all_posts = result.scalars().all()
-    posts_dict = [{
-        'id': str(post.id),
-        'title': post.title,
-        'content': post.content,
-        'user_id': post.user_id,
-        'deleted': post.deleted,
-        'created_at': post.created_at,
-        'updated_at': post.updated_at,
-        'tags': [{'id': tag.id, 'name': tag.name} for tag in post.tags]
-    } for post in all_posts]
-    
-    filtered_posts = posts_dict
-    if search:
-        search_keywords = search.split()
-        filtered_posts = []
-
-        for post in posts_dict:
-            title = post['title'].lower()
-            content = post['content'].lower()
-            tags = " ".join([tag['name'].lower() for tag in post['tags']])
-            if any(
-                keyword.lower() in title or
-                keyword.lower() in content or
-                keyword.lower() in tags
-                for keyword in search_keywords
-            ):
-                filtered_posts.append(post)
-        
-    total_posts = len(filtered_posts)
-    paginated_posts = filtered_posts[offset:offset + limit]
+    conditions = [Post.deleted == False]
+    # Mismo sentido en ambas columnas: sin busqueda se recorre ix_posts_live_created_at_id hacia atras
+    order_by = [Post.created_at.desc(), Post.id.desc()]
+
+    search_query = build_search_query(search)
+    if search_query:
+        ts_query = func.to_tsquery("simple", search_query)
+        conditions.append(Post.search_vector.op("@@")(ts_query))
+        order_by.insert(0, func.ts_rank_cd(Post.search_vector, ts_query).desc())
+
+    total_posts = await db.scalar(select(func.count()).select_from(Post).where(*conditions))
+
+    query = select(Post).where(*conditions).order_by(*order_by).offset(offset).limit(limit)
+    # La consulta dinamica entra como variable de cierre: mismas opciones de content que posts_page
+    result = await db.execute(post_content_options(lambda_stmt(lambda: query), *content_projection(fields)))
+    paginated_posts = [serialize_post(post, fields) for post in result.scalars().all()]
+
     return {
         "total": total_posts,
         "posts": paginated_posts,
         "limit": limit,
         "offset": offset,
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,78 @@
+# Sentencias de las rutas calientes como lambda_stmt: SQLAlchemy cachea la construccion
+# por ubicacion en el codigo y solo extrae los parametros en cada llamada.
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import func, lambda_stmt, select, tuple_, type_coerce
+from sqlalchemy.orm import defer, selectinload, undefer, with_expression
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from app.models.post import Post
+from app.models.user import User
+
+
+def post_by_id(post_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Post).where(Post.id == post_id, Post.deleted == False).options(selectinload(Post.tags))
+    )
+
+
+def post_content_options(stmt, with_content: bool, excerpt_length: Optional[int]):
+    # Sin content la columna no se lee de Postgres; acceder a ella falla en vez de cargarla
+    if not with_content:
+        stmt += lambda s: s.options(defer(Post.content, raiseload=True))
+    if excerpt_length is not None:
+        stmt += lambda s: s.options(with_expression(Post.excerpt, func.left(Post.content, excerpt_length)))
+    return stmt
+
+
+def paginate_posts(
+    stmt: StatementLambdaElement,
+    offset: int,
+    limit: int,
+    after: Optional[Tuple[datetime, str]] = None
+) -> StatementLambdaElement:
+    # Unico lugar con la paginacion de posts vivos: offset o keyset sobre (created_at, id)
+    stmt += lambda s: s.where(Post.deleted == False).order_by(Post.created_at, Post.id)
+    if after is not None:
+        # Los valores del cursor van por separado para que queden como parametros tipados
+        after_created_at, after_id = after
+        stmt += lambda s: s.where(
+            tuple_(Post.created_at, Post.id) > tuple_(type_coerce(after_created_at, Post.created_at.type), after_id)
+        )
+    else:
+        stmt += lambda s: s.offset(offset)
+    stmt += lambda s: s.limit(limit)
+    return stmt
+
+
+def posts_page(
+    offset: int,
+    limit: int,
+    after: Optional[Tuple[datetime, str]] = None,
+    with_content: bool = True,
+    excerpt_length: Optional[int] = None
+) -> StatementLambdaElement:
+    stmt = lambda_stmt(lambda: select(Post).options(selectinload(Post.tags)))
+    stmt = post_content_options(stmt, with_content, excerpt_length)
+    return paginate_posts(stmt, offset, limit, after)
+
+
+def posts_versions_page(offset: int, limit: int, after: Optional[Tuple[datetime, str]] = None) -> StatementLambdaElement:
+    # Misma pagina que posts_page, pero solo (id, updated_at): sin content ni tags
+    return paginate_posts(lambda_stmt(lambda: select(Post.id, Post.updated_at)), offset, limit, after)
+
+
+def active_user_by_id(user_id: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.id == user_id, User.active == True))
+
+
+def active_user_by_email_hash(email_hash: str, with_password: bool = False) -> StatementLambdaElement:
+    stmt = lambda_stmt(lambda: select(User).where(User.email_hash == email_hash, User.active == True))
+    if with_password:
+        stmt += lambda s: s.options(undefer(User.password))
+    return stmt
+
+
+def principal_by_email_hash(email_hash: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(User.id, User.role, User.active).where(User.email_hash == email_hash, User.active == True)
+    )
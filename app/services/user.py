@@ -1,12 +1,59 @@
+import asyncio
+from datetime import datetime
 from fastapi import Query
+from sqlalchemy import String, func, or_, tuple_, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.user import User
+from app.core.config import settings
+from app.core.dependencies import invalidate_principal
+from app.core.security import blind_index, blind_search_tokens
+from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate
-from typing import List, Optional
+from app.services.password import hash_password
+from app.services.statements import active_user_by_email_hash, active_user_by_id, principal_by_email_hash
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Columnas cifradas de los listados: se leen como texto cifrado y se descifran en un hilo
+ENCRYPTED_LIST_FIELDS = ("name_complete", "email")
+
+
+def encrypted_raw(field: str):
+    return type_coerce(getattr(User, field), String).label(field)
+
+
+def decrypt_user_rows(rows: Iterable) -> List[dict]:
+    # Puede correr en un hilo: ver decrypt_rows
+    column_types = {field: User.__table__.c[field].type for field in ENCRYPTED_LIST_FIELDS}
+    users = []
+    for row in rows:
+        user = row._asdict()
+        for field, column_type in column_types.items():
+            if field in user:
+                user[field] = column_type.process_result_value(user[field], None)
+        if "role" in user:
+            user["role"] = user["role"].value
+        users.append(user)
+    return users
+
+async def decrypt_rows(function: Callable, rows: Sequence, *args) -> List[dict]:
+    # El hilo agrega ~1-3 ms de ida y vuelta: solo compensa cuando descifrar en linea bloquearia
+    # el loop mas que eso (benchmarks/decryption.py)
+    if len(rows) < settings.USER_DECRYPT_THREAD_MIN_ROWS:
+        return function(rows, *args)
+    return await asyncio.to_thread(function, rows, *args)
+
+def matching_users(rows: Iterable, keywords: List[str]) -> List[dict]:
+    # Los blind tokens dan candidatos (todos los n-gramas presentes, no necesariamente la subcadena):
+    # se confirma cada keyword sobre los valores descifrados
+    users = []
+    for user in decrypt_user_rows(rows):
+        values = (user["name_complete"].lower(), user["email"].lower(), user["role"])
+        if any(keyword in value for keyword in keywords for value in values):
+            users.append(user)
+    return users
 
 async def get_user(db: AsyncSession, user_id: str) -> User:    
-    result = await db.execute(select(User).where(User.id == user_id, User.active == True))
+    result = await db.execute(active_user_by_id(user_id))
     user = result.scalars().first()      
     return user
 
@@ -15,23 +62,43 @@ async def get_user_deactivate(db: AsyncSession, user_id: str) -> User:
     user = result.scalars().first()      
     return user
 
-async def get_user_by_email(db: AsyncSession, email: str) -> User:
-    result = await db.execute(select(User).where(User.email == email, User.active == True))
+async def get_user_by_email(db: AsyncSession, email: str, with_password: bool = False) -> User:
+    result = await db.execute(active_user_by_email_hash(blind_index(email), with_password))
     user = result.scalars().first()        
     return user
 
-async def get_users(db: AsyncSession, offset: int, limit: int) -> List[User]:
-    query = select(User).where(User.active == True).offset(offset).limit(limit)    
-    result = await db.execute(query)        
-    users = result.scalars().all()  
-    return users 
+async def get_user_principal(db: AsyncSession, email: str):
+    # Lo que necesita get_current_user, sin descifrar ninguna columna
+    result = await db.execute(principal_by_email_hash(blind_index(email)))
+    return result.one_or_none()
+
+async def get_users(
+    db: AsyncSession,
+    offset: int,
+    limit: int,
+    after: Optional[Tuple[datetime, str]] = None
+) -> List[dict]:
+    query = select(
+        User.id,
+        *(encrypted_raw(field) for field in ENCRYPTED_LIST_FIELDS),
+        User.role,
+        User.active,
+        User.created_at,
+        User.updated_at,
+    ).where(User.active == True).order_by(User.created_at, User.id)
+    if after is not None:
+        query = query.where(tuple_(User.created_at, User.id) > after)
+    else:
+        query = query.offset(offset)
+    result = await db.execute(query.limit(limit))        
+    return await decrypt_rows(decrypt_user_rows, result.all())
 
 async def create_user(db: AsyncSession, user: UserCreate) -> User:    
     db_user = User(
         name_complete=user.name_complete,
         email=user.email,
         role=user.role,
-        password=user.password,  
+        password=await hash_password(user.password),  
         active=user.active     
     )
     db.add(db_user)
@@ -48,6 +115,7 @@ async def update_user(db: AsyncSession, user_id: str, user_data: UserUpdate):
         db_user.active = user_data.active
         await db.commit()
         await db.refresh(db_user)
+        invalidate_principal(user_id)
     return db_user
 
 async def deactivate_user(db: AsyncSession, user_id: str) -> bool:
@@ -57,6 +125,7 @@ async def deactivate_user(db: AsyncSession, user_id: str) -> bool:
     db_user.active = 0  # Soft-delete
     await db.commit()
     await db.refresh(db_user)
+    invalidate_principal(user_id)
     return True 
 
 async def activate_user(db: AsyncSession, user_id: str) -> bool:
@@ -66,6 +135,7 @@ async def activate_user(db: AsyncSession, user_id: str) -> bool:
     db_user.active = 1  # Soft-activate
     await db.commit()
     await db.refresh(db_user)
+    invalidate_principal(user_id)
     return True 
 
 async def filter_users(   
@@ -73,40 +143,33 @@ async def filter_users(
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
     search: Optional[str] = Query(default=None)        
-) -> List[User]:
-    
-    result = await db.execute(select(User))
-    all_users = result.scalars().all()
-
-    users_dict = [{
-        'id': str(user.id),
-        'name_complete': user.name_complete,
-        'email': user.email,
-        'role': user.role.value,
-    } for user in all_users]
-    
-    filtered_users = users_dict 
-
-    if search:
-        search_keywords = search.split()          
-        for user in users_dict:
-            name_complete = f"{user['name_complete']}".lower()
-            email = f"{user['email']}".lower()
-            role = f"{user['role']}".lower()
-            if any(
-                keyword.lower() in name_complete or 
-                keyword.lower() in email.lower() or
-                keyword.lower() in role.lower() for keyword in search_keywords):                
-                filtered_users.append(user)            
-        
-        filtered_users = filtered_users
-
-    total_users = len(filtered_users)
-    paginated_users = filtered_users[offset:offset + limit]
+) -> dict:
+    """Lanza ValueError si alguna palabra de search es demasiado corta para los blind indexes."""
+    query = select(User.id, *(encrypted_raw(field) for field in ENCRYPTED_LIST_FIELDS), User.role)
+    keywords = [keyword.lower() for keyword in search.split()] if search else []
+    if not keywords:
+        total_users = await db.scalar(select(func.count()).select_from(User))
+        result = await db.execute(query.order_by(User.created_at, User.id).offset(offset).limit(limit))
+        paginated_users = await decrypt_rows(decrypt_user_rows, result.all())
+    else:
+        matches = []
+        for keyword in keywords:
+            # name_complete y email se buscan por sus blind indexes (GIN); los roles son fijos y
+            # se resuelven aqui, asi la consulta no lleva un LIKE sin indice que fuerce un Seq Scan
+            matches.append(User.search_tokens.contains(blind_search_tokens(keyword)))
+            roles = [role for role in UserRole if keyword in role.value]
+            if roles:
+                matches.append(User.role.in_(roles))
+
+        # Los candidatos se filtran tras descifrar: el total y la pagina salen de lo confirmado
+        result = await db.execute(query.where(or_(*matches)).order_by(User.created_at, User.id))
+        users = await decrypt_rows(matching_users, result.all(), keywords)
+        total_users = len(users)
+        paginated_users = users[offset:offset + limit]
 
     return {
         "total": total_users,
         "clients": paginated_users,
         "limit": limit,
         "offset": offset,
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,129 @@
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Deque, Optional, Pattern, Sequence, Tuple
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.utils.metrics import counter, gauge, histogram, registry
+
+ADMISSION_REJECTED = counter(
+    "admission_rejected_total",
+    "Peticiones rechazadas con 503 por grupo de rutas y motivo",
+    ("group", "reason"),
+)
+ADMISSION_QUEUE_WAIT = histogram(
+    "admission_queue_wait_seconds",
+    "Espera en la cola de admision por grupo de rutas",
+    ("group",),
+)
+ADMISSION_IN_FLIGHT = gauge("admission_in_flight", "Peticiones admitidas en curso por grupo", ("group",))
+ADMISSION_QUEUED = gauge("admission_queued", "Peticiones esperando admision por grupo", ("group",))
+
+
+class RouteLimiter:
+    """Semaforo FIFO con cola acotada: rechaza en vez de acumular esperas sin limite."""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, timeout: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> Optional[str]:
+        """Devuelve None si entra, o el motivo del rechazo."""
+        if self.active < self.concurrency and not self.waiters:
+            self.active += 1
+            return None
+        if len(self.waiters) >= self.queue_size:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+            return None
+        except asyncio.TimeoutError:
+            # Igual que al cancelar: release() pudo ceder el hueco justo antes del timeout
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            return "timeout"
+        except asyncio.CancelledError:
+            # El hueco pudo transferirse justo antes de cancelar: se devuelve
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+    def release(self) -> None:
+        # El hueco pasa directamente al siguiente en la cola; active no cambia
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+def default_limiters() -> Sequence[Tuple[Pattern, RouteLimiter]]:
+    timeout = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+    heavy = RouteLimiter("heavy", settings.ADMISSION_HEAVY_CONCURRENCY, settings.ADMISSION_HEAVY_QUEUE_SIZE, timeout)
+    return (
+        (re.compile(r"^/api/v1/(posts|users)/filter$"), RouteLimiter(
+            "search", settings.ADMISSION_SEARCH_CONCURRENCY, settings.ADMISSION_SEARCH_QUEUE_SIZE, timeout
+        )),
+        (re.compile(r"^/api/v1/posts/(export|bulk/)"), heavy),
+        (re.compile(r"^/api/"), RouteLimiter(
+            "default", settings.ADMISSION_DEFAULT_CONCURRENCY, settings.ADMISSION_DEFAULT_QUEUE_SIZE, timeout
+        )),
+    )
+
+
+class AdmissionControlMiddleware:
+    """Middleware ASGI puro: limita la concurrencia por grupo de rutas y descarta carga con 503."""
+
+    def __init__(self, app: ASGIApp, limiters: Optional[Sequence[Tuple[Pattern, RouteLimiter]]] = None):
+        self.app = app
+        self.limiters = limiters if limiters is not None else default_limiters()
+        registry.register_collector(self.collect)
+
+    def limiter_for(self, path: str) -> Optional[RouteLimiter]:
+        # La primera coincidencia gana; health y metrics quedan fuera
+        for pattern, limiter in self.limiters:
+            if pattern.match(path):
+                return limiter
+        return None
+
+    def collect(self) -> None:
+        for _, limiter in self.limiters:
+            ADMISSION_IN_FLIGHT.set(limiter.name, value=limiter.active)
+            ADMISSION_QUEUED.set(limiter.name, value=len(limiter.waiters))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = self.limiter_for(scope["path"]) if scope["type"] == "http" else None
+        if limiter is None or not settings.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        rejected = await limiter.acquire()
+        ADMISSION_QUEUE_WAIT.observe(limiter.name, value=time.perf_counter() - start_time)
+        if rejected:
+            ADMISSION_REJECTED.inc(limiter.name, rejected)
+            response = JSONResponse(
+                {"detail": "Service overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
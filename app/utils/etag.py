@@ -0,0 +1,34 @@
+import hashlib
+from typing import Iterable, Optional
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def post_etag(id: str, updated_at) -> str:
+    return make_etag(id, updated_at.isoformat() if updated_at else "")
+
+
+def page_etag(rows: Iterable, *extra) -> str:
+    # Para listados: ids de la pagina (en orden) y el mayor updated_at
+    rows = list(rows)
+    max_updated_at = max((row.updated_at for row in rows if row.updated_at), default=None)
+    return make_etag(
+        *extra,
+        max_updated_at.isoformat() if max_updated_at else "",
+        ",".join(row.id for row in rows),
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # If-None-Match usa comparacion debil: se ignora el prefijo W/
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -0,0 +1,50 @@
+import csv
+import io
+from typing import AsyncIterator, Iterable
+
+import orjson
+
+from app.utils.serializers import serialize_post
+
+CSV_COLUMNS = ("id", "title", "content", "user_id", "created_at", "updated_at", "tags")
+
+
+def ndjson_lines(posts: Iterable) -> bytes:
+    return b"".join(orjson.dumps(serialize_post(post)) + b"\n" for post in posts)
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+def csv_lines(posts: Iterable) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for post in posts:
+        writer.writerow((
+            post.id,
+            post.title,
+            post.content,
+            post.user_id,
+            post.created_at.isoformat(),
+            post.updated_at.isoformat(),
+            "|".join(tag.name for tag in post.tags),
+        ))
+    return buffer.getvalue().encode()
+
+
+async def encode_posts(posts: AsyncIterator, format: str, batch_size: int) -> AsyncIterator[bytes]:
+    # Se envia un bloque por cada batch_size posts para no hacer un send por fila
+    encode = csv_lines if format == "csv" else ndjson_lines
+    if format == "csv":
+        yield csv_header()
+    batch = []
+    async for post in posts:
+        batch.append(post)
+        if len(batch) >= batch_size:
+            yield encode(batch)
+            batch = []
+    if batch:
+        yield encode(batch)
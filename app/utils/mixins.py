@@ -1,6 +1,8 @@
 from datetime import datetime
 import pytz
-from sqlalchemy import Column, Boolean, DateTime, select
+from typing import List
+from sqlalchemy import Column, Boolean, DateTime, String, any_, bindparam, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import Query
 
@@ -11,14 +13,20 @@ class SoftDeleteMixin:
 
     @classmethod
     async def soft_delete(cls, db, id: str) -> bool:
-        query = select(cls).where(cls.id == id, cls.deleted == False)
-        result = await db.execute(query)
-        instance = result.scalars().first()
-        if instance:
-            instance.deleted = True
-            await db.commit()
-            return True
-        return False
+        deleted = await cls.soft_delete_many(db, [id])
+        await db.commit()
+        return bool(deleted)
+
+    @classmethod
+    async def soft_delete_many(cls, db, ids: List[str]) -> List[str]:
+        # Un solo UPDATE con un unico parametro array; el commit queda a cargo del llamador
+        result = await db.execute(
+            update(cls.__table__)
+            .where(cls.id == any_(bindparam("ids", list(ids), type_=ARRAY(String))), cls.deleted == False)
+            .values(deleted=True)
+            .returning(cls.id)
+        )
+        return list(result.scalars())
 
     @classmethod
     def filter_deleted(cls, query: Query) -> Query:
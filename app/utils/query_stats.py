@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.metrics import counter, histogram
+
+logger = logging.getLogger("QueryStats")
+
+DB_QUERIES_PER_REQUEST = histogram(
+    "db_queries_per_request",
+    "Sentencias SQL ejecutadas por peticion",
+    ("route",),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_TIME_PER_REQUEST = histogram(
+    "db_time_per_request_seconds",
+    "Tiempo total en la base de datos por peticion",
+    ("route",),
+)
+DB_N_PLUS_ONE = counter(
+    "db_n_plus_one_suspected_total",
+    "Peticiones que repiten la misma sentencia SQL (posible N+1)",
+    ("route",),
+)
+
+_PLACEHOLDER_LIST = re.compile(r"(\$\d+|%\(\w+\)s|\?)(\s*,\s*(\$\d+|%\(\w+\)s|\?))*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    # Listas de parametros (IN expandidos, VALUES multi-fila) cuentan como una sola sentencia
+    normalized = _WHITESPACE.sub(" ", _PLACEHOLDER_LIST.sub("?", statement)).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    statements: Dict[str, str] = field(default_factory=dict)
+
+    def record(self, statement: str, duration: float) -> None:
+        key = fingerprint(statement)
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[key] += 1
+        self.statements.setdefault(key, statement)
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        return {key: count for key, count in self.fingerprints.items() if count >= threshold}
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = conn.info["query_start_time"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - start_time)
+
+
+def _handle_error(exception_context):
+    # Una sentencia que falla no llega a after_cursor_execute: sin sacar su marca, las
+    # siguientes de la conexion tomarian un inicio ajeno
+    conn = exception_context.connection
+    if conn is None or exception_context.statement is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if start_times:
+        start_time = start_times.pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(exception_context.statement, time.perf_counter() - start_time)
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def report_query_stats(stats: QueryStats, route: str, threshold: int) -> Dict[str, int]:
+    DB_QUERIES_PER_REQUEST.observe(route, value=stats.count)
+    DB_TIME_PER_REQUEST.observe(route, value=stats.duration)
+    repeated = stats.repeated(threshold)
+    if repeated:
+        DB_N_PLUS_ONE.inc(route)
+        for key, count in repeated.items():
+            logger.warning("Possible N+1 on %s: %d x %s", route, count, stats.statements[key][:200])
+    return repeated
@@ -0,0 +1,56 @@
+# Serializacion directa de filas ORM a tipos JSON nativos: evita construir modelos
+# Pydantic que FastAPI volveria a validar a traves de response_model.
+from typing import Optional, Sequence, Tuple
+
+POST_FIELDS = ("id", "title", "content", "excerpt", "user_id", "deleted", "created_at", "updated_at", "tags")
+# Lo que muestra el feed: sin content, con un extracto recortado en la base de datos
+SUMMARY_FIELDS = ("id", "title", "excerpt", "user_id", "created_at", "updated_at", "tags")
+
+
+def serialize_tag(tag) -> dict:
+    return {"id": tag.id, "name": tag.name}
+
+
+def resolve_post_fields(view: str, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """None significa la representacion completa; fields tiene prioridad sobre view."""
+    if fields:
+        selected = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        if not selected:
+            raise ValueError("No fields selected")
+        unknown = [field for field in selected if field not in POST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return selected
+    if view == "summary":
+        return SUMMARY_FIELDS
+    return None
+
+
+def serialize_post(post, fields: Optional[Sequence[str]] = None) -> dict:
+    if fields is not None:
+        return {
+            field: [serialize_tag(tag) for tag in post.tags] if field == "tags" else getattr(post, field)
+            for field in fields
+        }
+    return {
+        "id": post.id,
+        "title": post.title,
+        "content": post.content,
+        "user_id": post.user_id,
+        "deleted": post.deleted,
+        "created_at": post.created_at,
+        "updated_at": post.updated_at,
+        "tags": [serialize_tag(tag) for tag in post.tags],
+    }
+
+
+def serialize_user(user) -> dict:
+    return {
+        "id": user.id,
+        "name_complete": user.name_complete,
+        "email": user.email,
+        "role": user.role.value,
+        "active": user.active,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+    }
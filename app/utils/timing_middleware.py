@@ -1,19 +1,82 @@
-import logging
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.utils.metrics import SIZE_BUCKETS, counter, gauge, histogram
+from app.utils.query_stats import QueryStats, current_query_stats, report_query_stats
 
+HTTP_REQUEST_DURATION = histogram(
+    "http_request_duration_seconds",
+    "Duracion de las peticiones HTTP por ruta",
+    ("method", "route"),
+)
+HTTP_RESPONSES = counter(
+    "http_responses_total",
+    "Respuestas HTTP por ruta y codigo de estado",
+    ("method", "route", "status"),
+)
+HTTP_RESPONSE_SIZE = histogram(
+    "http_response_size_bytes",
+    "Tamano del cuerpo de las respuestas HTTP por ruta",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+HTTP_IN_FLIGHT = gauge(
+    "http_requests_in_flight",
+    "Peticiones HTTP en curso",
+)
 
-logger = logging.getLogger("Timing")
-logging.basicConfig(level=logging.INFO)
 
-class TimingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        start_time = time.perf_counter()  
-        response = await call_next(request)  
-        end_time = time.perf_counter() 
-        process_time = end_time - start_time  
-        logger.info(f" Request: {request.method} {request.url} - Duration: {process_time:.4f} seconds")
+def route_template(scope: Scope) -> str:
+    # FastAPI deja la ruta resuelta en el scope; se usa su plantilla para no explotar la cardinalidad
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
 
-        return response
+
+class TimingMiddleware:
+    """Middleware ASGI puro: metricas por ruta, SQL por peticion y cabecera Server-Timing."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+        response_size = 0
+        query_stats = QueryStats()
+        token = current_query_stats.set(query_stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", f"app;dur={(time.perf_counter() - start_time) * 1000:.1f}")
+                if settings.SQL_DEBUG_HEADERS:
+                    headers.append("Server-Timing", f"db;dur={query_stats.duration * 1000:.1f}")
+                    headers["X-DB-Query-Count"] = str(query_stats.count)
+                    headers["X-DB-Time-Ms"] = f"{query_stats.duration * 1000:.1f}"
+                    repeated = query_stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+                    if repeated:
+                        headers["X-DB-N-Plus-One"] = ",".join(f"{key}x{count}" for key, count in repeated.items())
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            HTTP_IN_FLIGHT.dec()
+            process_time = time.perf_counter() - start_time
+            method = scope["method"]
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.observe(method, route, value=process_time)
+            HTTP_RESPONSES.inc(method, route, str(status_code))
+            HTTP_RESPONSE_SIZE.observe(method, route, value=response_size)
+            report_query_stats(query_stats, route, settings.N_PLUS_ONE_THRESHOLD)
@@ -0,0 +1,57 @@
+"""Compara dos resultados de benchmarks.run y falla si hay regresiones.
+
+Uso:
+    python -m benchmarks.compare baseline.json current.json --max-regression 0.10
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+# (metrica, True si mayor es peor)
+METRICS = (
+    ("p50_ms", True),
+    ("p95_ms", True),
+    ("p99_ms", True),
+    ("throughput_rps", False),
+    ("max_statements", True),
+)
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> List[str]:
+    regressions = []
+    for scenario, before in baseline["results"].items():
+        after = current["results"].get(scenario)
+        if after is None:
+            regressions.append(f"{scenario}: missing from current run")
+            continue
+        for metric, higher_is_worse in METRICS:
+            old, new = before.get(metric, 0), after.get(metric, 0)
+            if not old:
+                continue
+            change = (new - old) / old
+            regressed = change > max_regression if higher_is_worse else change < -max_regression
+            marker = "REGRESSION" if regressed else ""
+            print(f"{scenario:>14} {metric:>15}: {old:>10} -> {new:>10} ({change:+.1%}) {marker}")
+            if regressed:
+                regressions.append(f"{scenario} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed relative change, e.g. 0.10")
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        regressions = compare(json.load(baseline_file), json.load(current_file), args.max_regression)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Generador de datos sinteticos (usuarios, posts y tags) para los benchmarks.
+
+Uso:
+    python -m benchmarks.datagen --scale 10k --migrate
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from nanoid import generate
+from sqlalchemy import func, insert, select
+
+from app.core import deps
+from app.models.post import Post, Tag, post_tags
+from app.models.user import User, UserRole
+from app.services.password import pwd_context
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BENCH_PASSWORD = "bench-password"
+BENCH_ADMIN_EMAIL = "bench-admin@example.com"
+CHUNK_SIZE = 2_000
+SEED = 20241111
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "po", "ra", "su", "ti", "ve", "zo", "bra", "cle", "dri", "fro", "gla", "pre", "sta", "tru"]
+
+
+def build_vocabulary(rng: random.Random, size: int = 2_000) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def scale_plan(posts: int) -> dict:
+    return {
+        "posts": posts,
+        "users": max(10, posts // 50),
+        "tags": max(50, posts // 100),
+    }
+
+
+def run_migrations() -> None:
+    from alembic import command
+    from alembic.config import Config
+    command.upgrade(Config("alembic.ini"), "head")
+
+
+async def generate_users(session, rng: random.Random, vocabulary: list, count: int) -> list:
+    roles = [UserRole.editor, UserRole.lector]
+    # Todos comparten contraseña: un solo hash basta
+    password_hash = pwd_context.hash(BENCH_PASSWORD)
+    users = [User(
+        name_complete="Bench Admin",
+        email=BENCH_ADMIN_EMAIL,
+        password=password_hash,
+        role=UserRole.admin,
+        active=True,
+    )]
+    for index in range(count - 1):
+        first, last = rng.sample(vocabulary, 2)
+        users.append(User(
+            name_complete=f"{first.title()} {last.title()}",
+            email=f"{first}.{last}.{index}@example.com",
+            password=password_hash,
+            role=rng.choice(roles),
+            active=rng.random() > 0.05,
+        ))
+    for start in range(0, len(users), CHUNK_SIZE):
+        session.add_all(users[start:start + CHUNK_SIZE])
+        await session.flush()
+    return [user.id for user in users if user.role in (UserRole.admin, UserRole.editor)]
+
+
+async def generate_tags(session, vocabulary: list, count: int) -> list:
+    now = datetime.now(pytz.utc)
+    rows = [
+        {"id": generate(), "name": f"{vocabulary[index % len(vocabulary)]}-{index}", "created_at": now, "updated_at": now}
+        for index in range(count)
+    ]
+    for start in range(0, len(rows), CHUNK_SIZE):
+        await session.execute(insert(Tag.__table__), rows[start:start + CHUNK_SIZE])
+    return [row["id"] for row in rows]
+
+
+async def generate_posts(session, rng: random.Random, vocabulary: list, author_ids: list, tag_ids: list, count: int) -> None:
+    start_time = datetime.now(pytz.utc) - timedelta(days=365)
+    for start in range(0, count, CHUNK_SIZE):
+        post_rows = []
+        link_rows = []
+        for index in range(start, min(start + CHUNK_SIZE, count)):
+            created_at = start_time + timedelta(seconds=index * 30)
+            post_id = generate()
+            post_rows.append({
+                "id": post_id,
+                "title": " ".join(rng.choices(vocabulary, k=rng.randint(3, 8))).capitalize(),
+                "content": " ".join(rng.choices(vocabulary, k=rng.randint(40, 400))),
+                "deleted": rng.random() < 0.03,
+                "user_id": rng.choice(author_ids),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            link_rows.extend(
+                {"post_id": post_id, "tag_id": tag_id}
+                for tag_id in rng.sample(tag_ids, rng.randint(0, 4))
+            )
+        await session.execute(insert(Post.__table__), post_rows)
+        if link_rows:
+            await session.execute(insert(post_tags), link_rows)
+        await session.commit()
+        print(f"  posts {min(start + CHUNK_SIZE, count)}/{count}")
+
+
+async def seed(scale: str) -> dict:
+    plan = scale_plan(SCALES[scale])
+    rng = random.Random(SEED)
+    vocabulary = build_vocabulary(rng)
+    deps.init_engine()
+    try:
+        async with deps.SessionLocal() as session:
+            existing = await session.scalar(select(func.count()).select_from(Post))
+            if existing:
+                raise SystemExit(f"Database already has {existing} posts; seed an empty database")
+            started = time.perf_counter()
+            author_ids = await generate_users(session, rng, vocabulary, plan["users"])
+            tag_ids = await generate_tags(session, vocabulary, plan["tags"])
+            await session.commit()
+            await generate_posts(session, rng, vocabulary, author_ids, tag_ids, plan["posts"])
+            plan["seconds"] = round(time.perf_counter() - started, 1)
+        # VACUUM no corre en una transaccion. Deja el visibility map al dia como lo haria autovacuum,
+        # asi los count(*) pueden resolverse con Index Only Scan igual que en produccion
+        async with deps.engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.exec_driver_sql("VACUUM ANALYZE")
+    finally:
+        await deps.dispose_engine()
+    return plan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed a local database with synthetic benchmark data")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--migrate", action="store_true", help="run alembic upgrade head first")
+    args = parser.parse_args()
+    if args.migrate:
+        run_migrations()
+    print(asyncio.run(seed(args.scale)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Micro-benchmark del descifrado de una pagina de usuarios (no necesita base de datos).
+
+Compara descifrar en el event loop con descifrar en un hilo (asyncio.to_thread) y mide
+cuanto tiempo queda bloqueado el loop en cada caso, con un latido cada milisegundo.
+
+El hilo baja el bloqueo del loop pero hace mas lenta cada peticion (ida y vuelta al pool de
+hilos y contencion del GIL). Medido en local: 500 usuarios, 19.6 ms en linea contra 22.8 ms
+en el hilo, con el bloqueo bajando de 20.6 a 8.7 ms; con 50 usuarios ambos quedan en ~2.5 ms.
+Por eso decrypt_rows solo usa el hilo desde USER_DECRYPT_THREAD_MIN_ROWS filas; la columna
+"auto" mide ese camino.
+
+Uso:
+    python -m benchmarks.decryption --users 50 200 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import namedtuple
+from typing import List
+
+from app.models.user import User, UserRole
+from app.core.config import settings
+from app.services.user import decrypt_rows, decrypt_user_rows
+
+UserRow = namedtuple("UserRow", "id name_complete email role active created_at updated_at")
+
+
+def fake_rows(count: int) -> List[UserRow]:
+    column_type = User.__table__.c.email.type
+    return [
+        UserRow(
+            id=f"user-{index}",
+            name_complete=column_type.process_bind_param(f"Bench User {index}", None),
+            email=column_type.process_bind_param(f"bench.user.{index}@example.com", None),
+            role=UserRole.lector,
+            active=True,
+            created_at=None,
+            updated_at=None,
+        )
+        for index in range(count)
+    ]
+
+
+async def max_loop_block(work) -> dict:
+    # El mayor hueco entre latidos aproxima cuanto tiempo estuvo bloqueado el loop
+    gaps = []
+    done = False
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.005)
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    done = True
+    await ticker
+    return {"wall_ms": elapsed * 1000, "max_block_ms": max(gaps, default=0.0) * 1000}
+
+
+async def run(count: int, rounds: int) -> dict:
+    rows = fake_rows(count)
+    assert decrypt_user_rows(rows[:1])[0]["email"] == "bench.user.0@example.com"
+
+    async def inline():
+        decrypt_user_rows(rows)
+
+    async def offloaded():
+        await asyncio.to_thread(decrypt_user_rows, rows)
+
+    async def auto():
+        await decrypt_rows(decrypt_user_rows, rows)
+
+    results = {}
+    for name, work in (("inline", inline), ("thread", offloaded), ("auto", auto)):
+        samples = [await max_loop_block(work) for _ in range(rounds)]
+        results[name] = {
+            key: round(sum(sample[key] for sample in samples) / rounds, 3)
+            for key in ("wall_ms", "max_block_ms")
+        }
+    return {
+        "users": count,
+        "rounds": rounds,
+        **results,
+        "loop_ms_saved_per_page": round(results["inline"]["max_block_ms"] - results["thread"]["max_block_ms"], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark user page decryption on and off the event loop")
+    parser.add_argument("--users", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    results = [asyncio.run(run(count, args.rounds)) for count in args.users]
+    print(json.dumps({"thread_min_rows": settings.USER_DECRYPT_THREAD_MIN_ROWS, "pages": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
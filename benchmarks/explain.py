@@ -0,0 +1,150 @@
+"""Regresion de planes: EXPLAIN de cada consulta caliente contra una base sembrada con benchmarks.datagen.
+
+Ejecuta las funciones de servicio reales, captura el SQL que emiten (incluidas las cargas
+selectin de tags) y lo vuelve a lanzar con EXPLAIN (FORMAT JSON). Termina con error si algun
+plan hace Seq Scan sobre una tabla de mas de --min-pages paginas. Las tablas chicas se
+ignoran: ahi un Seq Scan es lo correcto.
+
+Uso:
+    python -m benchmarks.explain --min-pages 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from sqlalchemy import event, func, select, text
+
+from app.core import deps
+from app.models.post import Post
+from app.models.user import User
+from app.services.post import filter_posts, get_post, get_post_version, get_posts, get_posts_versions, get_tag_counts
+from app.services.user import filter_users, get_user, get_user_by_email, get_user_principal, get_users
+from benchmarks.datagen import BENCH_ADMIN_EMAIL
+
+# Consultas que recorren la tabla completa por diseno (agregado global sobre post_tags)
+SEQ_SCAN_ALLOWED = {"tags_counts"}
+TABLE_PAGES = text(
+    "SELECT relname, relpages FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+)
+
+
+async def sample_keys(session) -> dict:
+    # Claves reales de la mitad del dataset para que los planes no dependan de valores extremos
+    posts = await session.scalar(select(func.count()).select_from(Post).where(Post.deleted == False))
+    users = await session.scalar(select(func.count()).select_from(User).where(User.active == True))
+    post = (await session.execute(
+        select(Post.id, Post.created_at, Post.title).where(Post.deleted == False)
+        .order_by(Post.created_at, Post.id).offset(posts // 2).limit(1)
+    )).one()
+    user = (await session.execute(
+        select(User.id, User.created_at).where(User.active == True)
+        .order_by(User.created_at, User.id).offset(users // 2).limit(1)
+    )).one()
+    return {
+        "post_id": post.id,
+        "post_after": (post.created_at, post.id),
+        "word": post.title.split()[0],
+        "user_id": user.id,
+        "user_after": (user.created_at, user.id),
+    }
+
+
+def scenarios(keys: dict) -> dict:
+    return {
+        "posts_show": lambda db: get_post(db, keys["post_id"]),
+        "posts_version": lambda db: get_post_version(db, keys["post_id"]),
+        "posts_page": lambda db: get_posts(db, offset=0, limit=100),
+        "posts_page_keyset": lambda db: get_posts(db, offset=0, limit=100, after=keys["post_after"]),
+        "posts_versions_keyset": lambda db: get_posts_versions(db, offset=0, limit=100, after=keys["post_after"]),
+        "posts_filter": lambda db: filter_posts(db, limit=10, offset=0, search=keys["word"]),
+        "users_show": lambda db: get_user(db, keys["user_id"]),
+        "users_by_email": lambda db: get_user_by_email(db, BENCH_ADMIN_EMAIL, with_password=True),
+        "users_principal": lambda db: get_user_principal(db, BENCH_ADMIN_EMAIL),
+        "users_page": lambda db: get_users(db, offset=0, limit=100),
+        "users_page_keyset": lambda db: get_users(db, offset=0, limit=100, after=keys["user_after"]),
+        "users_filter": lambda db: filter_users(db, limit=10, offset=0, search="bench"),
+        # "admin" tambien coincide con un rol: la consulta suma role IN (...) al blind index
+        "users_filter_role": lambda db: filter_users(db, limit=10, offset=0, search="admin"),
+        "users_filter_all": lambda db: filter_users(db, limit=10, offset=0, search=None),
+        "tags_counts": lambda db: get_tag_counts(db, limit=50),
+    }
+
+
+def seq_scans(plan: dict) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def explain_scenario(session, run) -> list:
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    sync_engine = deps.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await run(session)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    connection = await session.connection()
+    for statement, parameters in captured:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()
+        plans.append((statement, (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]))
+    return plans
+
+
+async def table_pages(session) -> dict:
+    result = await session.execute(TABLE_PAGES)
+    return {row.relname: row.relpages for row in result}
+
+
+async def run(min_pages: int) -> dict:
+    deps.init_engine()
+    report = {}
+    try:
+        async with deps.SessionLocal() as session:
+            keys = await sample_keys(session)
+            pages = await table_pages(session)
+            for name, scenario in scenarios(keys).items():
+                failures = []
+                plans = await explain_scenario(session, scenario)
+                for statement, plan in plans:
+                    for relation in seq_scans(plan):
+                        if pages.get(relation, 0) >= min_pages:
+                            failures.append({"relation": relation, "statement": " ".join(statement.split())[:200]})
+                report[name] = {
+                    "statements": len(plans),
+                    "seq_scans": failures,
+                    "allowed": name in SEQ_SCAN_ALLOWED,
+                }
+            await session.rollback()
+    finally:
+        await deps.dispose_engine()
+    return {"pages": pages, "scenarios": report}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail if a hot query plan falls back to a sequential scan")
+    parser.add_argument("--min-pages", type=int, default=100, help="ignore seq scans on tables smaller than this")
+    args = parser.parse_args()
+    report = asyncio.run(run(args.min_pages))
+    print(json.dumps(report, indent=2, default=str))
+    failed = [name for name, result in report["scenarios"].items() if result["seq_scans"] and not result["allowed"]]
+    if failed:
+        print(f"Sequential scans in: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
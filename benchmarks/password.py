@@ -0,0 +1,86 @@
+"""Micro-benchmark de verificacion de contraseñas (no necesita base de datos).
+
+Lanza logins concurrentes verificando en el event loop o en el pool de app.services.password
+y mide, a la vez, cuanto se retrasa una peticion "ajena" que solo duerme 5 ms en bucle.
+
+Uso:
+    python -m benchmarks.password --logins 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from app.services.password import pwd_context, shutdown_password_pool, verify_password
+from benchmarks.run import percentile
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def measure(verify, stored: str, total: int, concurrency: int) -> dict:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    counter = iter(range(total))
+
+    async def worker():
+        for _ in counter:
+            valid = await verify("bench-password", stored)
+            assert valid
+
+    prober = asyncio.create_task(probe(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+
+    ordered = sorted(lags)
+    return {
+        "logins_per_second": round(total / elapsed, 2),
+        "probe_lag_p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "probe_lag_p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "probe_lag_max_ms": round(max(ordered, default=0.0) * 1000, 3),
+    }
+
+
+async def inline_verify(password: str, stored: str) -> bool:
+    return pwd_context.verify(password, stored)
+
+
+async def pooled_verify(password: str, stored: str) -> bool:
+    valid, _ = await verify_password(password, stored)
+    return valid
+
+
+async def run(total: int, concurrency: int) -> dict:
+    stored = pwd_context.hash("bench-password")
+    try:
+        return {
+            "scheme": pwd_context.identify(stored),
+            "logins": total,
+            "concurrency": concurrency,
+            "inline": await measure(inline_verify, stored, total, concurrency),
+            "thread_pool": await measure(pooled_verify, stored, total, concurrency),
+        }
+    finally:
+        shutdown_password_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark password verification on and off the event loop")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.logins, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Benchmark de la API en proceso contra una base de datos local sembrada con benchmarks.datagen.
+
+Uso:
+    python -m benchmarks.run --requests 500 --concurrency 20 --out results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import select
+
+from app.core import deps
+from app.core.config import settings
+from app.main import app
+from app.models.post import Post
+from benchmarks.datagen import BENCH_ADMIN_EMAIL, BENCH_PASSWORD, SEED, build_vocabulary
+
+# Maximo de sentencias SQL por peticion (el COMMIT no cuenta); evita regresiones de N+1
+STATEMENT_BUDGETS = {
+    "posts_create": 4,
+    "posts_show": 2,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank
+    rank = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+def summarize(latencies: List[float], statements: List[int], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_statements": max(statements, default=0),
+    }
+
+
+async def measure(
+    name: str,
+    total: int,
+    concurrency: int,
+    request: Callable[[int], Awaitable[httpx.Response]],
+) -> dict:
+    latencies: List[float] = []
+    statements: List[int] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            start_time = time.perf_counter()
+            response = await request(index)
+            latencies.append(time.perf_counter() - start_time)
+            if response.status_code >= 400:
+                errors += 1
+            statements.append(int(response.headers.get("x-db-query-count", 0)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, statements, errors, time.perf_counter() - started)
+    print(f"{name:>14}: {result}")
+    return result
+
+
+async def run(total: int, concurrency: int, warmup: int) -> Dict[str, dict]:
+    settings.SQL_DEBUG_HEADERS = True
+    rng = random.Random(SEED)
+    vocabulary = build_vocabulary(random.Random(SEED))
+
+    async with app.router.lifespan_context(app):
+        async with deps.SessionLocal() as session:
+            post_ids = (await session.scalars(
+                select(Post.id).where(Post.deleted == False).limit(2_000)
+            )).all()
+        if not post_ids:
+            raise SystemExit("No posts found: seed the database with benchmarks.datagen first")
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            credentials = {"email": BENCH_ADMIN_EMAIL, "password": BENCH_PASSWORD}
+            login = await client.post("/api/v1/auth/login", json=credentials)
+            login.raise_for_status()
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            tag_pool = [f"bench-{word}" for word in vocabulary[:50]]
+
+            scenarios = {
+                "posts_all": lambda i: client.get(
+                    "/api/v1/posts/all", params={"limit": 100, "offset": rng.randint(0, 5_000)}, headers=headers
+                ),
+                "posts_filter": lambda i: client.get(
+                    "/api/v1/posts/filter", params={"search": rng.choice(vocabulary), "limit": 20}, headers=headers
+                ),
+                "posts_show": lambda i: client.get(
+                    f"/api/v1/posts/show/{rng.choice(post_ids)}", headers=headers
+                ),
+                "posts_create": lambda i: client.post(
+                    "/api/v1/posts/create",
+                    json={
+                        "title": " ".join(rng.choices(vocabulary, k=5)),
+                        "content": " ".join(rng.choices(vocabulary, k=100)),
+                        "user_id": "",
+                        "tag_names": rng.sample(tag_pool, 3),
+                    },
+                    headers=headers,
+                ),
+                "auth_login": lambda i: client.post("/api/v1/auth/login", json=credentials),
+                "users_filter": lambda i: client.get(
+                    "/api/v1/users/filter", params={"search": rng.choice(vocabulary)[:4], "limit": 20}, headers=headers
+                ),
+            }
+
+            results = {}
+            for name, request in scenarios.items():
+                if warmup:
+                    await measure(f"{name} warmup", warmup, concurrency, request)
+                results[name] = await measure(name, total, concurrency, request)
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def check_budgets(results: Dict[str, dict]) -> List[str]:
+    failures = []
+    for name, budget in STATEMENT_BUDGETS.items():
+        if name in results and results[name]["max_statements"] > budget:
+            failures.append(f"{name}: {results[name]['max_statements']} statements (budget {budget})")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the in-process API benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=50, help="warm-up requests per scenario")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, args.concurrency, args.warmup))
+    failures = check_budgets(results)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+        "statement_budget_failures": failures,
+    }
+    with open(args.out, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.out}")
+    if failures:
+        print("Statement budget exceeded:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Micro-benchmark de serializacion de una pagina de read_posts (no necesita base de datos).
+
+Compara el camino anterior (PostResponse a mano + validacion de response_model +
+jsonable_encoder + json.dumps) con serialize_post + ORJSONResponse.
+
+Uso:
+    python -m benchmarks.serialization --posts 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas.post import PostResponse
+from app.schemas.tag import TagResponse
+from app.utils.serializers import serialize_post
+
+
+def fake_posts(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=f"post-{index}",
+            title=f"Post title {index}",
+            content="lorem ipsum dolor sit amet " * 40,
+            user_id="user-1",
+            deleted=False,
+            created_at=now - timedelta(minutes=index),
+            updated_at=now,
+            tags=[SimpleNamespace(id=f"tag-{tag}", name=f"tag {tag}") for tag in range(index % 4)],
+        )
+        for index in range(count)
+    ]
+
+
+async def legacy_path(posts: list, field) -> bytes:
+    content = [
+        PostResponse(
+            id=post.id,
+            title=post.title,
+            content=post.content,
+            tags=[TagResponse(id=tag.id, name=tag.name) for tag in post.tags],
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+            user_id=post.user_id,
+            deleted=post.deleted,
+        )
+        for post in posts
+    ]
+    validated = await serialize_response(field=field, response_content=content)
+    return JSONResponse(validated).body
+
+
+async def fast_path(posts: list) -> bytes:
+    return ORJSONResponse([serialize_post(post) for post in posts]).body
+
+
+async def timed(function, rounds: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        await function()
+    return (time.perf_counter() - start_time) / rounds
+
+
+async def run(count: int, rounds: int) -> dict:
+    posts = fake_posts(count)
+    field = create_response_field(name="Response_read_posts", type_=List[PostResponse])
+    assert json.loads(await legacy_path(posts, field)) == json.loads(await fast_path(posts))
+
+    legacy = await timed(lambda: legacy_path(posts, field), rounds)
+    fast = await timed(lambda: fast_path(posts), rounds)
+    return {
+        "posts": count,
+        "rounds": rounds,
+        "legacy_ms": round(legacy * 1000, 3),
+        "orjson_ms": round(fast * 1000, 3),
+        "speedup": round(legacy / fast, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark read_posts serialization")
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.posts, args.rounds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark de arranque en frio contra una base de datos sembrada con benchmarks.datagen.
+
+Cada modo corre en un proceso nuevo y mide la importacion de app.main, el arranque del
+lifespan y la latencia de las primeras peticiones, con y sin warm-up.
+
+Uso:
+    python -m benchmarks.startup
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+CHILD_FLAG = "--child"
+
+
+async def child() -> dict:
+    import httpx
+
+    started = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - started) * 1000
+
+    from benchmarks.datagen import BENCH_ADMIN_EMAIL, BENCH_PASSWORD
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        startup_ms = (time.perf_counter() - started) * 1000
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            credentials = {"email": BENCH_ADMIN_EMAIL, "password": BENCH_PASSWORD}
+            request_started = time.perf_counter()
+            login = await client.post("/api/v1/auth/login", json=credentials)
+            login.raise_for_status()
+            login_ms = (time.perf_counter() - request_started) * 1000
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            timings = []
+            for _ in range(3):
+                request_started = time.perf_counter()
+                response = await client.get("/api/v1/posts/all", params={"limit": 20}, headers=headers)
+                response.raise_for_status()
+                timings.append(round((time.perf_counter() - request_started) * 1000, 3))
+    return {
+        "import_ms": round(import_ms, 1),
+        "startup_ms": round(startup_ms, 1),
+        "first_login_ms": round(login_ms, 3),
+        "first_requests_ms": timings,
+    }
+
+
+def run_mode(warmup: bool) -> dict:
+    env = dict(os.environ, WARMUP_ENABLED="true" if warmup else "false")
+    output = subprocess.check_output([sys.executable, "-m", "benchmarks.startup", CHILD_FLAG], env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    if CHILD_FLAG in sys.argv:
+        import asyncio
+        print(json.dumps(asyncio.run(child())))
+        return
+
+    parser = argparse.ArgumentParser(description="Measure cold start with and without warm-up")
+    parser.parse_args()
+    print(json.dumps({"warmup": run_mode(True), "no_warmup": run_mode(False)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
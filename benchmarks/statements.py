@@ -0,0 +1,87 @@
+"""Micro-benchmark del costo en Python de preparar las sentencias calientes (no necesita base de datos).
+
+Por llamada mide lo que hace SQLAlchemy antes de enviar nada a Postgres: construir la
+sentencia, calcular su cache key y obtener la version compilada de la cache. Compara
+select() construido en cada llamada con los lambda_stmt de app.services.statements.
+
+Uso:
+    python -m benchmarks.statements --calls 20000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import selectinload
+
+from app.core.security import blind_index
+from app.models.post import Post
+from app.models.user import User
+from app.services import statements
+
+AFTER = (datetime(2024, 1, 1, tzinfo=timezone.utc), "cursor-id")
+EMAIL_HASH = blind_index("bench-admin@example.com")
+
+# Como se construian antes de app.services.statements
+LEGACY = {
+    "get_post": lambda: select(Post).where(Post.id == "post-1", Post.deleted == False).options(selectinload(Post.tags)),
+    "get_posts": lambda: select(Post).options(selectinload(Post.tags)).where(Post.deleted == False)
+    .order_by(Post.created_at, Post.id).where(tuple_(Post.created_at, Post.id) > AFTER).limit(100),
+    "get_user": lambda: select(User).where(User.id == "user-1", User.active == True),
+    "get_user_by_email": lambda: select(User).where(User.email_hash == EMAIL_HASH, User.active == True),
+}
+LAMBDAS = {
+    "get_post": lambda: statements.post_by_id("post-1"),
+    "get_posts": lambda: statements.posts_page(0, 100, AFTER),
+    "get_user": lambda: statements.active_user_by_id("user-1"),
+    "get_user_by_email": lambda: statements.active_user_by_email_hash(EMAIL_HASH),
+}
+
+
+def per_call_us(build, calls: int) -> float:
+    dialect = postgresql.asyncpg.dialect()
+    compiled_cache = {}
+
+    def prepare():
+        # Mismo recorrido que Connection.execute hasta tener el SQL compilado
+        statement = build()
+        statement._compile_w_cache(
+            dialect,
+            compiled_cache=compiled_cache,
+            column_keys=[],
+            for_executemany=False,
+            schema_translate_map=None,
+        )
+
+    for _ in range(100):
+        prepare()
+    started = time.perf_counter()
+    for _ in range(calls):
+        prepare()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def run(calls: int) -> dict:
+    results = {}
+    for name in LEGACY:
+        legacy = per_call_us(LEGACY[name], calls)
+        cached = per_call_us(LAMBDAS[name], calls)
+        results[name] = {
+            "select_us": round(legacy, 2),
+            "lambda_us": round(cached, 2),
+            "speedup": round(legacy / cached, 2),
+        }
+    return {"calls": calls, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-call statement overhead")
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.calls), indent=2))
+
+
+if __name__ == "__main__":
+    main()
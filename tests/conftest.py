@@ -0,0 +1,15 @@
+import os
+
+# Settings se lee al importar app.core.config: valores minimos para importar los servicios sin .env
+for name, value in {
+    "PROJECT_NAME": "post_app_tests",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_DATABASE": "test",
+    "DB_SECRET_KEY": "test-secret",
+    "JWT_SECRET_KEY": "test-jwt-secret",
+    "ALGORITHM": "HS256",
+}.items():
+    os.environ.setdefault(name, value)
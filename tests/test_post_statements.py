@@ -0,0 +1,174 @@
+"""Presupuesto de sentencias SQL por escritura de create_post y update_post.
+
+Una sesion falsa cuenta cada execute y responde segun la tabla afectada, asi el test
+no necesita Postgres y falla si vuelven los refresh o re-selects tras el commit.
+"""
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.jobs import QueueFull
+from app.schemas.post import PostCreate, PostUpdate
+from app.services import post as post_service
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def one(self):
+        return self.rows[0]
+
+    def one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class CountingSession:
+    """Registra las sentencias en orden; created/existing simulan el estado de la tabla tags."""
+
+    def __init__(self, created_tags=None, existing_tags=None, current_tags=None):
+        self.created_tags = created_tags or {}
+        self.existing_tags = existing_tags or {}
+        self.current_tags = current_tags or []
+        self.statements = []
+        self.commits = 0
+        self.sync_session = SimpleNamespace(info={})
+
+    def post_row(self, **values):
+        return SimpleNamespace(
+            id=values.get("id", "post-1"),
+            title="Title",
+            content="Content",
+            user_id="user-1",
+            deleted=False,
+            created_at=NOW,
+            updated_at=NOW,
+            current_tags=self.current_tags,
+        )
+
+    async def execute(self, statement):
+        if statement.is_dml:
+            table = statement.table.name
+            kind = "insert" if statement.is_insert else "update"
+        else:
+            table = statement.columns_clause_froms[0].name
+            kind = "select"
+        self.statements.append(f"{kind} {table}")
+
+        if table == "posts":
+            return FakeResult([self.post_row()])
+        if table == "tags" and kind == "insert":
+            return FakeResult([SimpleNamespace(id=tag_id, name=name) for name, tag_id in self.created_tags.items()])
+        if table == "tags":
+            return FakeResult([SimpleNamespace(id=tag_id, name=name) for name, tag_id in self.existing_tags.items()])
+        return FakeResult([])
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def empty_tag_cache():
+    post_service.tag_id_cache.clear()
+    yield
+    post_service.tag_id_cache.clear()
+
+
+@pytest.fixture
+def full_queue(monkeypatch):
+    def enqueue(*args, **kwargs):
+        raise QueueFull("apply_post_tags")
+    monkeypatch.setattr(post_service.job_queue, "enqueue", enqueue)
+
+
+def create(session, tag_names, defer_tags=False):
+    post = PostCreate(title="Title", content="Content", user_id="user-1", tag_names=tag_names)
+    return asyncio.run(post_service.create_post(session, post, defer_tags=defer_tags))
+
+
+def update(session, tag_names, defer_tags=False):
+    post = PostUpdate(title="Title", content="Content", tag_names=tag_names)
+    return asyncio.run(post_service.update_post(session, "post-1", post, user_id="user-1", defer_tags=defer_tags))
+
+
+def test_create_post_without_tags():
+    session = CountingSession()
+    response = create(session, [])
+    assert session.statements == ["insert posts"]
+    assert session.commits == 1
+    assert response.tags == []
+
+
+def test_create_post_with_cached_tags():
+    post_service.tag_id_cache.set("python", "tag-1")
+    session = CountingSession()
+    response = create(session, ["python"])
+    assert session.statements == ["insert posts", "insert post_tags"]
+    assert session.commits == 1
+    assert [tag.id for tag in response.tags] == ["tag-1"]
+
+
+def test_create_post_with_new_tags():
+    session = CountingSession(created_tags={"python": "tag-1"})
+    create(session, ["python"])
+    assert session.statements == ["insert tags", "insert posts", "insert post_tags"]
+    assert session.commits == 1
+
+
+def test_create_post_with_uncached_existing_tags():
+    # ON CONFLICT no devuelve los que ya existian: un SELECT extra y nada mas
+    session = CountingSession(created_tags={"python": "tag-1"}, existing_tags={"sql": "tag-2"})
+    response = create(session, ["python", "sql"])
+    assert session.statements == ["insert tags", "select tags", "insert posts", "insert post_tags"]
+    assert session.commits == 1
+    assert {tag.name for tag in response.tags} == {"python", "sql"}
+
+
+def test_update_post_without_new_tags():
+    session = CountingSession(current_tags=[{"id": "tag-1", "name": "python"}])
+    response = update(session, [])
+    assert session.statements == ["update posts"]
+    assert session.commits == 1
+    assert [tag.name for tag in response.tags] == ["python"]
+
+
+def test_update_post_with_cached_tags():
+    post_service.tag_id_cache.set("sql", "tag-2")
+    session = CountingSession(current_tags=[{"id": "tag-1", "name": "python"}])
+    response = update(session, ["python", "sql"])
+    assert session.statements == ["update posts", "insert post_tags"]
+    assert session.commits == 1
+    assert {tag.name for tag in response.tags} == {"python", "sql"}
+
+
+def test_update_post_with_uncached_tags():
+    session = CountingSession(created_tags={"rust": "tag-3"}, existing_tags={"sql": "tag-2"})
+    update(session, ["rust", "sql"])
+    assert session.statements == ["update posts", "insert tags", "select tags", "insert post_tags"]
+    assert session.commits == 1
+
+
+def test_create_post_deferred_tags_linked_inline_when_queue_is_full(full_queue):
+    post_service.tag_id_cache.set("python", "tag-1")
+    session = CountingSession()
+    response = create(session, ["python"], defer_tags=True)
+    assert session.statements == ["insert posts", "insert post_tags", "update posts"]
+    # La respuesta refleja lo enlazado, asi su ETag coincide con la siguiente lectura
+    assert [tag.id for tag in response.tags] == ["tag-1"]
+    assert response.updated_at > NOW
+
+
+def test_update_post_deferred_tags_linked_inline_when_queue_is_full(full_queue):
+    post_service.tag_id_cache.set("sql", "tag-2")
+    session = CountingSession(current_tags=[{"id": "tag-1", "name": "python"}])
+    response = update(session, ["python", "sql"], defer_tags=True)
+    assert session.statements == ["update posts", "insert post_tags", "update posts"]
+    assert {tag.name for tag in response.tags} == {"python", "sql"}
+    assert response.updated_at > NOW